@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        # 生产环境在进程启动时预编译并校验所有模板
+        if settings.TEMPLATE_PRELOAD:
+            from utils.template_preload import preload_templates
+            preload_templates(self.label)
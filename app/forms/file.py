@@ -3,8 +3,8 @@ from django.core.exceptions import ValidationError
 
 from app import models
 from app.forms.bootstrap import BootStrapForm
-from utils.tencent.cos import CosManager
-from qcloud_cos.cos_exception import CosServiceError
+from utils.storage.base import StorageFileNotFound
+from utils.storage.factory import get_storage
 
 
 class FolderModelForm(BootStrapForm, forms.ModelForm):
@@ -52,11 +52,14 @@ class FileModelForm(forms.ModelForm):
     """
     # 从前端接收POST过来的etag，用于和COS上的真实etag进行比对
     etag = forms.CharField(label='ETag')
+    # 是否在clean中请求存储核对元数据；批量提交时由视图统一并发核对
+    verify_cos = True
 
     class Meta:
         model = models.FileRepository
         # 排除这些字段，它们将由后端逻辑自动填充，而不是由用户提交
-        exclude = ['project', 'file_type', 'update_user', 'update_datetime', 'file_path']
+        exclude = ['project', 'file_type', 'update_user', 'update_datetime', 'file_path', 'thumbnail_path',
+                   'total_size', 'file_count']
 
     def __init__(self, request, *args, **kwargs):
         """
@@ -68,33 +71,55 @@ class FileModelForm(forms.ModelForm):
     def clean(self):
         """
         表单级别验证：在所有字段都通过基础验证后执行。
-        核心职责：调用COS API，核对前端提交的文件元数据（key, etag, size）是否真实存在于云端。
+        核心职责：调用存储API，核对前端提交的文件元数据（key, etag, size）是否真实存在于云端。
         """
         key = self.cleaned_data.get('key')
         etag = self.cleaned_data.get('etag')
-        size = self.cleaned_data.get('size')
 
-        if not key or not etag:
+        if not self.verify_cos or not key or not etag:
             return super().clean()
 
         project = self.request.tracer.project
-        cos_client = CosManager(region=project.region)
+        storage_client = get_storage(region=project.region)
 
         try:
-            cos_metadata = cos_client.check_file(bucket=project.bucket, key=key)
-        except CosServiceError:
+            cos_metadata = storage_client.check_file(bucket=project.bucket, key=key)
+        except StorageFileNotFound:
             self.add_error('key', '文件不存在或上传凭证无效。')
             return super().clean()
 
+        self.check_metadata(cos_metadata, storage_client)
+        return self.cleaned_data
+
+    def check_metadata(self, cos_metadata, storage_client):
+        """
+        将存储返回的元数据与前端提交的 etag、file_size 进行比对，并补全 file_path。
+        :param cos_metadata: check_file 返回的元数据字典。
+        :param storage_client: 存储后端实例，用于生成文件的访问URL。
+        """
+        project = self.request.tracer.project
+        key = self.cleaned_data.get('key')
+        etag = self.cleaned_data.get('etag')
+        size = self.cleaned_data.get('file_size')
+
         cos_etag = cos_metadata.get('ETag', "")
         if f'"{etag}"' != cos_etag:
             self.add_error('etag', '文件内容校验失败，请重新上传。')
 
         cos_length = int(cos_metadata.get('Content-Length', 0))
         if cos_length != size:
-            self.add_error('size', '文件大小校验失败，请重新上传。')
+            self.add_error('file_size', '文件大小校验失败，请重新上传。')
+
+        self.cleaned_data['file_path'] = storage_client.get_url(project.bucket, key)
+
 
-        full_url = f"https://{project.bucket}.cos.{project.region}.myqcloud.com/{key}"
-        self.cleaned_data['file_path'] = full_url
+class FileBatchItemForm(FileModelForm):
+    """
+    批量提交文件时，用于校验单个文件字段的表单。
+    - 父目录由视图统一校验一次，避免每个文件各查询一次。
+    - 存储元数据由视图通过 check_file_list 并发核对，再调用 check_metadata 比对。
+    """
+    verify_cos = False
 
-        return self.cleaned_data
\ No newline at end of file
+    class Meta(FileModelForm.Meta):
+        exclude = FileModelForm.Meta.exclude + ['parent']
@@ -1,16 +1,17 @@
 from django import forms
-from django.db.models import Q
+from django.urls import reverse
 
 from app.forms.bootstrap import BootStrapForm
 from app import models
+from utils.issues_choices import get_issues_choices
 
 
 class IssuesModelForm(BootStrapForm, forms.ModelForm):
     """
     用于新建和编辑 Issues（问题）的 ModelForm。
     - 自动应用Bootstrap样式。
-    - 高效地动态生成所有下拉选项的查询集。
-    - 自动排除不合逻辑的选项（如将问题自身设为父问题）。
+    - 下拉选项来自缓存的项目选项（问题类型、模块、成员），渲染表单时不查询数据库。
+    - 父问题不再列出项目的全部问题，只渲染当前值，其余通过 issues_parent_search 接口异步搜索。
     """
 
     class Meta:
@@ -26,28 +27,38 @@ class IssuesModelForm(BootStrapForm, forms.ModelForm):
 
     def __init__(self, request, *args, **kwargs):
         """
-        重写构造方法，以 Django 推荐的方式动态设置外键字段的 queryset。
+        queryset 只用于校验提交的值（按主键查询一次），渲染使用的 choices 来自缓存。
         """
         super().__init__(*args, **kwargs)
         project = request.tracer.project
-        self.fields['issues_type'].queryset = models.IssuesType.objects.filter(project=project)
-        self.fields['module'].queryset = models.Module.objects.filter(project=project)
-        self.fields['module'].empty_label = "--- 未选择 ---"
-
-        project_users_queryset = models.UserInfo.objects.filter(
-            Q(id=project.creator_id) | Q(projectuser__project=project)
-        ).distinct()
+        choices = get_issues_choices(project)
+        member_ids = [user_id for user_id, _ in choices['member']]
 
-        self.fields['assign'].queryset = project_users_queryset
+        self.fields['module'].empty_label = "--- 未选择 ---"
         self.fields['assign'].empty_label = "--- 未指派 ---"
-        self.fields['attention'].queryset = project_users_queryset
+        self.fields['parent'].empty_label = "--- 无父问题 ---"
+
+        self._set_choices('issues_type', models.IssuesType.objects.filter(project=project), choices['issues_type'])
+        self._set_choices('module', models.Module.objects.filter(project=project), choices['module'])
+        member_queryset = models.UserInfo.objects.filter(id__in=member_ids)
+        self._set_choices('assign', member_queryset, choices['member'])
+        self._set_choices('attention', member_queryset, choices['member'])
 
         parent_queryset = models.Issues.objects.filter(project=project)
+        search_url = reverse('issues_parent_search', kwargs={'project_id': project.id})
         if self.instance.pk:
             parent_queryset = parent_queryset.exclude(pk=self.instance.pk)
-
-        self.fields['parent'].queryset = parent_queryset
-        self.fields['parent'].empty_label = "--- 无父问题 ---"
+            search_url = f'{search_url}?exclude={self.instance.pk}'
+        parent = self.instance.parent if self.instance.parent_id else None
+        self._set_choices('parent', parent_queryset, [(parent.id, f'#{parent.id} {parent.subject}')] if parent else [])
+        self.fields['parent'].widget.attrs['data-search-url'] = search_url
+
+    def _set_choices(self, name, queryset, choices):
+        """ 设置字段的校验 queryset 和渲染 choices，必须先设置 queryset（它会重置 choices）。 """
+        field = self.fields[name]
+        field.queryset = queryset
+        empty_choices = [('', field.empty_label)] if field.empty_label is not None else []
+        field.choices = empty_choices + list(choices)
 
 
 class IssuesReplyModelForm(BootStrapForm, forms.ModelForm):
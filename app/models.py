@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import connections, models
 
 
 class UserInfo(models.Model):
@@ -67,6 +67,7 @@ class Project(models.Model):
     desc = models.CharField(verbose_name='项目描述', max_length=255, null=True, blank=True)
 
     use_space = models.BigIntegerField(verbose_name='项目已使用空间(字节)', default=0)
+    reserve_space = models.BigIntegerField(verbose_name='项目已预留空间(字节)', default=0)
     star = models.BooleanField(verbose_name='星标', default=False)
 
     join_count = models.SmallIntegerField(verbose_name='参与人数', default=1)
@@ -94,6 +95,19 @@ class ProjectUser(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.project.name}"
 
+class SpaceReservation(models.Model):
+    """项目空间预留表（签发上传凭证时预留，文件写入后转为已使用空间）"""
+    project = models.ForeignKey(verbose_name='项目', to='Project', on_delete=models.CASCADE)
+    user = models.ForeignKey(verbose_name='用户', to='UserInfo', on_delete=models.CASCADE)
+    size = models.BigIntegerField(verbose_name='剩余预留空间(字节)')
+    expire_datetime = models.DateTimeField(verbose_name='过期时间', db_index=True)
+    create_datetime = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'expire_datetime']),
+        ]
+
 class Wiki(models.Model):
     """wiki存储表"""
     project = models.ForeignKey(verbose_name='项目', to='Project', on_delete=models.CASCADE)
@@ -116,10 +130,22 @@ class FileRepository(models.Model):
     key = models.CharField(verbose_name='文件存储在COS中的KEY', max_length=128, null=True, blank=True)
     file_size = models.BigIntegerField(verbose_name='文件大小', null=True, blank=True)
     file_path = models.CharField(verbose_name='文件路径', max_length=255, null=True, blank=True)
+    thumbnail_path = models.CharField(verbose_name='缩略图路径', max_length=255, null=True, blank=True)
+    total_size = models.BigIntegerField(verbose_name='文件夹总大小', default=0, help_text='仅文件夹使用，包含所有子孙文件')
+    file_count = models.IntegerField(verbose_name='文件夹文件数', default=0, help_text='仅文件夹使用，包含所有子孙文件')
     parent = models.ForeignKey(verbose_name='父目录', to='self', on_delete=models.CASCADE, null=True, blank=True, related_name='child')
     update_user = models.ForeignKey(verbose_name='最近更新者', to='UserInfo', on_delete=models.CASCADE)
     update_datetime = models.DateTimeField(verbose_name='更新时间', auto_now_add=True)
 
+    class Meta:
+        # 文件列表按 (父目录, 类型, 排序字段, id) 做游标分页，每种排序方式对应一个复合索引
+        indexes = [
+            models.Index(fields=['project', 'parent', 'file_type', 'name', 'id']),
+            models.Index(fields=['project', 'parent', 'file_type', 'file_size', 'id']),
+            models.Index(fields=['project', 'parent', 'file_type', 'total_size', 'id']),
+            models.Index(fields=['project', 'parent', 'file_type', 'update_datetime', 'id']),
+        ]
+
 class Module(models.Model):
     """模块(里程碑)"""
     project = models.ForeignKey(verbose_name='项目', to='Project', on_delete=models.CASCADE)
@@ -137,6 +163,67 @@ class IssuesType(models.Model):
     def __str__(self):
         return self.title
 
+class IssuesManager(models.Manager):
+    """
+    问题的层级（父问题/子问题）查询，均用递归CTE在一条SQL中完成。
+    层级数据中可能已经存在环（校验加入之前写入的数据），递归深度限制为 MAX_DEPTH 层。
+    """
+    MAX_DEPTH = 50
+
+    def _fetch_dicts(self, sql, params):
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def descendants(self, root_id):
+        """
+        获取问题本身及其全部子孙问题，按 (层级, id) 排列，父问题总是排在子问题前面。
+        :return: [{'id', 'subject', 'status', 'priority', 'assign_id', 'parent_id', 'depth'}, ...]，根问题的 depth 为 0。
+        """
+        table = self.model._meta.db_table
+        sql = f"""
+            WITH RECURSIVE tree(id, depth) AS (
+                SELECT id, 0 FROM {table} WHERE id = %s
+                UNION ALL
+                SELECT child.id, tree.depth + 1 FROM {table} child
+                INNER JOIN tree ON child.parent_id = tree.id
+                WHERE tree.depth < %s
+            )
+            SELECT issue.id, issue.subject, issue.status, issue.priority, issue.assign_id, issue.parent_id, tree.depth
+            FROM tree INNER JOIN {table} issue ON issue.id = tree.id
+            ORDER BY tree.depth, issue.id
+        """
+        return self._fetch_dicts(sql, [root_id, self.MAX_DEPTH])
+
+    def ancestor_ids(self, issues_ids):
+        """
+        获取问题本身及其全部祖先问题的ID。
+        :param issues_ids: 问题ID列表。
+        :return: ID集合。
+        """
+        issues_ids = list(issues_ids)
+        if not issues_ids:
+            return set()
+        table = self.model._meta.db_table
+        placeholders = ', '.join(['%s'] * len(issues_ids))
+        sql = f"""
+            WITH RECURSIVE chain(id, parent_id, depth) AS (
+                SELECT id, parent_id, 0 FROM {table} WHERE id IN ({placeholders})
+                UNION ALL
+                SELECT parent.id, parent.parent_id, chain.depth + 1 FROM {table} parent
+                INNER JOIN chain ON parent.id = chain.parent_id
+                WHERE chain.depth < %s
+            )
+            SELECT DISTINCT id FROM chain
+        """
+        return {row['id'] for row in self._fetch_dicts(sql, issues_ids + [self.MAX_DEPTH])}
+
+    def would_create_cycle(self, issues_id, parent_id):
+        """ 把 parent_id 设为 issues_id 的父问题是否会形成环（父问题是它自己或它的子孙问题）。 """
+        return issues_id in self.ancestor_ids([parent_id])
+
+
 class Issues(models.Model):
     """问题"""
     project = models.ForeignKey(verbose_name='项目', to='Project', on_delete=models.CASCADE)
@@ -174,6 +261,14 @@ class Issues(models.Model):
     create_datetime = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
     latest_update_datetime = models.DateTimeField(verbose_name='最后更新时间', auto_now=True)
 
+    objects = IssuesManager()
+
+    class Meta:
+        # 父问题异步搜索按主题前缀匹配
+        indexes = [
+            models.Index(fields=['project', 'subject']),
+        ]
+
     def __str__(self):
         return self.subject
 
@@ -190,6 +285,13 @@ class IssuesReply(models.Model):
     create_datetime = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
     reply = models.ForeignKey(verbose_name='回复', to='self', null=True, blank=True, on_delete=models.CASCADE)
 
+    class Meta:
+        # 操作记录时间线按 (问题, 创建时间, id) 做游标分页；统计按 (类型, 创建时间) 取时间范围内的状态修改记录
+        indexes = [
+            models.Index(fields=['issues', 'create_datetime', 'id']),
+            models.Index(fields=['reply_type', 'create_datetime']),
+        ]
+
 class ProjectInvite(models.Model):
     """项目邀请码"""
     project = models.ForeignKey(verbose_name='项目', to='Project', on_delete=models.CASCADE)
@@ -204,4 +306,23 @@ class ProjectInvite(models.Model):
     )
     period = models.IntegerField(verbose_name='有效期', choices=period_choices, default=1440)
     create_datetime = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
-    creator = models.ForeignKey(verbose_name='创建者', to='UserInfo', on_delete=models.CASCADE, related_name='create_invite')
\ No newline at end of file
+    creator = models.ForeignKey(verbose_name='创建者', to='UserInfo', on_delete=models.CASCADE, related_name='create_invite')
+
+
+class Notification(models.Model):
+    """问题通知（指派人和关注者的收件箱），同一问题短时间内的多次变更合并为一条"""
+    recipient = models.ForeignKey(verbose_name='接收者', to='UserInfo', on_delete=models.CASCADE, related_name='notification')
+    project = models.ForeignKey(verbose_name='项目', to='Project', on_delete=models.CASCADE)
+    issues = models.ForeignKey(verbose_name='问题', to='Issues', on_delete=models.CASCADE)
+    actor = models.ForeignKey(verbose_name='最近操作者', to='UserInfo', on_delete=models.CASCADE, related_name='sent_notification')
+    content = models.TextField(verbose_name='通知内容')
+    event_count = models.PositiveIntegerField(verbose_name='合并的变更数', default=1)
+    is_read = models.BooleanField(verbose_name='是否已读', default=False)
+    create_datetime = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
+    update_datetime = models.DateTimeField(verbose_name='最近变更时间')
+
+    class Meta:
+        # 收件箱按 (接收者, 未读, 最近变更时间) 读取
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', 'update_datetime']),
+        ]
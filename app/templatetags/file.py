@@ -1,4 +1,6 @@
 from django import template
+from django.utils.html import format_html
+from django.utils.http import urlencode
 import math
 
 register = template.Library()
@@ -28,4 +30,26 @@ def filesizeformat(value):
 
     formatted_size = round(value / (1024 ** power), 2)
 
-    return f"{formatted_size} {units[power]}"
\ No newline at end of file
+    return f"{formatted_size} {units[power]}"
+
+@register.simple_tag(takes_context=True)
+def sort_header(context, sort_key, title):
+    """
+    渲染文件列表中可点击排序的表头。
+    再次点击当前排序列时切换升序/降序，并保留当前所在的文件夹。
+
+    :param sort_key: 排序键（name / size / date / updater）。
+    :param title: 表头显示的文字。
+    """
+    is_current = context.get('sort') == sort_key
+    order = 'desc' if is_current and context.get('order') == 'asc' else 'asc'
+    query_params = {'sort': sort_key, 'order': order}
+    folder_object = context.get('folder_object')
+    if folder_object:
+        query_params['folder'] = folder_object.id
+
+    icon = 'fa-sort'
+    if is_current:
+        icon = 'fa-sort-up' if context.get('order') == 'asc' else 'fa-sort-down'
+    return format_html('<a class="sort-header" href="?{}">{} <i class="fas {}"></i></a>',
+                       urlencode(query_params), title, icon)
@@ -1,6 +1,9 @@
+from functools import lru_cache
+
 from django.template import Library
 from django.urls import reverse
-from app import models
+from utils.fragment_cache import get_or_render_fragment
+from utils.project_index import get_project_index
 from django import template
 
 register = Library()
@@ -10,37 +13,102 @@ def all_project_list(request):
     """
     Inclusion Tag: 获取并返回用户所有相关的项目列表。
 
-    这个标签专门用于渲染导航栏中的项目下拉菜单。
+    这个标签专门用于渲染导航栏中的项目下拉菜单，数据来自Redis中缓存的用户项目索引。
     """
-    my_project_list = models.Project.objects.filter(creator=request.tracer.user)
-    join_project_list = models.ProjectUser.objects.filter(user=request.tracer.user)
+    project_index = get_project_index(request.tracer.user)
+    my_project_list = [item for item in project_index if item['type'] == 'my']
+    join_project_list = [item for item in project_index if item['type'] == 'join']
     return {'my': my_project_list, 'join': join_project_list, 'request': request}
 
 
+# 侧边栏菜单: (标题, 路由名称)
+MANAGE_MENU_LIST = (
+    ('概览', 'dashboard'),
+    ('问题', 'issues'),
+    ('统计', 'statistics'),
+    ('文件', 'file'),
+    ('wiki', 'wiki'),
+    ('配置', 'setting'),
+)
+# 编译菜单时代入的占位项目ID，随后被替换为 {project_id}
+_PROJECT_ID_PLACEHOLDER = 1234567890
+
+
+@lru_cache(maxsize=None)
+def compile_manage_menu():
+    """
+    将侧边栏菜单编译为URL模板，每个进程只调用一次 reverse()。
+
+    :return: (项目URL前缀模板, [(标题, URL模板), ...], {URL第一段: 菜单下标})
+             例如 ('/manage/{project_id}/', [('概览', '/manage/{project_id}/dashboard/'), ...], {'dashboard': 0, ...})
+    """
+    placeholder = str(_PROJECT_ID_PLACEHOLDER)
+    menu_list = []
+    segment_dict = {}
+    prefix = None
+    for index, (title, url_name) in enumerate(MANAGE_MENU_LIST):
+        url = reverse(url_name, kwargs={'project_id': _PROJECT_ID_PLACEHOLDER})
+        url_prefix, _, url_suffix = url.partition(f"/{placeholder}/")
+        prefix = f"{url_prefix}/{{project_id}}/"
+        menu_list.append((title, prefix + url_suffix))
+        segment_dict[url_suffix.split('/', 1)[0]] = index
+    return prefix, menu_list, segment_dict
+
+
 @register.inclusion_tag('app/inclusion/manage_menu_list.html')
 def manage_menu_list(request):
     """
     Inclusion Tag: 生成项目管理页面的侧边栏菜单。
+    URL由预编译的模板格式化得到，当前菜单通过URL第一段的字典查找确定，渲染时不再调用 reverse()。
     """
-    data_list = [
-        {'title': '概览', 'url_name': 'dashboard'},
-        {'title': '问题', 'url_name': 'issues'},
-        {'title': '统计', 'url_name': 'statistics'},
-        {'title': '文件', 'url_name': 'file'},
-        {'title': 'wiki', 'url_name': 'wiki'},
-        {'title': '配置', 'url_name': 'setting'},
-    ]
-    for item in data_list:
-        item['url'] = reverse(item['url_name'], kwargs={'project_id': request.tracer.project.id})
-        if request.path_info.startswith(item['url']):
-            item['class'] = 'active'
+    prefix, menu_list, segment_dict = compile_manage_menu()
+    project_id = request.tracer.project.id
+    data_list = [{'title': title, 'url': url.format(project_id=project_id)} for title, url in menu_list]
+
+    project_prefix = prefix.format(project_id=project_id)
+    if request.path_info.startswith(project_prefix):
+        segment = request.path_info[len(project_prefix):].split('/', 1)[0]
+        index = segment_dict.get(segment)
+        if index is not None:
+            data_list[index]['class'] = 'active'
     return {'data_list': data_list}
 
 @register.inclusion_tag('app/inclusion/_project_card.html')
 def render_project_card(project_item, project_type):
     """
     渲染一个项目卡片的 inclusion tag。
-    :param project_item: 项目对象 (Project model instance)
+    :param project_item: 项目索引中的项目字典 (见 utils.project_index)
     :param project_type: 项目类型 ('my' or 'join')
     """
-    return {'project': project_item, 'project_type': project_type}
\ No newline at end of file
+    return {'project': project_item, 'project_type': project_type}
+
+
+class ProjectCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        return get_or_render_fragment(
+            context['request'],
+            self.fragment_name.resolve(context),
+            lambda: self.nodelist.render(context),
+            [item.resolve(context) for item in self.vary_on]
+        )
+
+
+@register.tag('project_cache')
+def project_cache(parser, token):
+    """
+    Block Tag: 按 (项目, 项目版本号, 用户角色) 缓存一段模板片段，项目数据变化后自动失效。
+
+    用法: {% project_cache '片段名' [影响内容的变量 ...] %} ... {% endproject_cache %}
+    片段内用到的数据应尽量延迟计算（如 QuerySet、SimpleLazyObject），缓存命中时才不会查询数据库。
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' 至少需要一个参数：片段名称。")
+    nodelist = parser.parse(('endproject_cache',))
+    parser.delete_first_token()
+    return ProjectCacheNode(nodelist, parser.compile_filter(bits[1]), [parser.compile_filter(bit) for bit in bits[2:]])
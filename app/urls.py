@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
-from app.views import account, home, project, statistics, wiki, file, setting, issues, dashboard
+from app.views import account, home, project, statistics, wiki, file, setting, issues, dashboard, storage, notification
 
 # --------------------------------------------------------------------------------
 # 定义项目管理内部的URL列表
@@ -16,12 +17,20 @@ project_manage_patterns = [
     path('statistics/', statistics.statistics, name='statistics'),
     path('statistics/priority/', statistics.statistics_priority, name='statistics_priority'),
     path('statistics/project/user/', statistics.statistics_project_user, name='statistics_project_user'),
+    path('statistics/throughput/', statistics.statistics_throughput, name='statistics_throughput'),
+    path('statistics/lead/time/', statistics.statistics_lead_time, name='statistics_lead_time'),
+    path('statistics/velocity/', statistics.statistics_velocity, name='statistics_velocity'),
 
     # 问题管理 (Issues)
     path('issues/', issues.issues, name='issues'),
     path('issues/detail/<int:issues_id>/', issues.issues_detail, name='issues_detail'),
-    # path('issues/record/<int:issues_id>/', issues.issues_record, name='issues_record'),
+    path('issues/record/<int:issues_id>/', issues.issues_record, name='issues_record'),
     path('issues/change/<int:issues_id>/', issues.issues_change, name='issues_change'),
+    path('issues/tree/<int:issues_id>/', issues.issues_tree, name='issues_tree'),
+    path('issues/bulk/', issues.issues_bulk, name='issues_bulk'),
+    path('issues/parent/search/', issues.issues_parent_search, name='issues_parent_search'),
+    path('issues/export/', issues.issues_export, name='issues_export'),
+    path('issues/import/', issues.issues_import, name='issues_import'),
     path('issues/invite/url/', issues.invite_url, name='invite_url'),
 
     # Wiki
@@ -34,9 +43,14 @@ project_manage_patterns = [
 
     # 文件管理 (File)
     path('file/', file.file, name='file'),
+    path('file/list/', file.file_list, name='file_list'),
     path('file/delete/', file.file_delete, name='file_delete'),
+    path('file/move/', file.file_move, name='file_move'),
+    path('file/copy/', file.file_copy, name='file_copy'),
     path('file/post/', file.file_post, name='file_post'),
+    path('file/post/batch/', file.file_post_batch, name='file_post_batch'),
     path('file/download/<int:file_id>/', file.file_download, name='file_download'),
+    path('file/download/folder/<int:folder_id>/', file.file_download_folder, name='file_download_folder'),
     path('cos/cos_credential/', file.cos_credential, name='cos_credential'),
 
     # 项目设置 (Setting)
@@ -45,6 +59,10 @@ project_manage_patterns = [
 ]
 
 
+# 问题实时推送只在开启 REALTIME_ENABLED（以ASGI方式部署）时注册
+if settings.REALTIME_ENABLED:
+    project_manage_patterns.append(path('issues/stream/', issues.issues_stream, name='issues_stream'))
+
 # --------------------------------------------------------------------------------
 # 定义主 URL 列表
 # --------------------------------------------------------------------------------
@@ -74,4 +92,11 @@ urlpatterns = [
     # 项目管理 (Manage) - 包含上述定义的所有子路由
     path('manage/<int:project_id>/', include(project_manage_patterns)),
     path('issues/invite/join/<str:code>/', issues.invite_join, name='invite_join'),
+
+    # 通知收件箱 (Notification)
+    path('notification/list/', notification.notification_list, name='notification_list'),
+    path('notification/read/', notification.notification_read, name='notification_read'),
+
+    # 本地/内存存储后端的对象读写接口
+    path('storage/<str:bucket>/<path:key>', storage.storage_object, name='storage_object'),
 ]
\ No newline at end of file
@@ -5,6 +5,7 @@ from django.db.models import Count
 from django.db.models.functions import TruncDate
 from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils.functional import SimpleLazyObject
 from app import models
 
 
@@ -18,14 +19,7 @@ def dashboard(request, project_id):
     3. 最新被指派的10个问题。
     """
 
-    status_dict = {
-        key: {"text": text, "count": 0}
-        for key, text in models.Issues.status_choices
-    }
-    issues_by_status = models.Issues.objects.filter(project_id=project_id).values('status').annotate(ct=Count('id'))
-    for item in issues_by_status:
-        status_dict[item['status']]["count"] = item['ct']
-
+    # 问题统计和成员列表在模板中使用片段缓存，数据延迟到缓存未命中时才查询
     user_list = models.ProjectUser.objects.filter(project_id=project_id).values_list('user_id', 'user__username')
 
     top_ten_issues = models.Issues.objects.filter(
@@ -34,13 +28,25 @@ def dashboard(request, project_id):
     ).select_related('assign', 'creator').order_by('-create_datetime')[0:10]
 
     context = {
-        'status_dict': status_dict,
+        'status_dict': SimpleLazyObject(lambda: _get_status_dict(project_id)),
         'user_list': user_list,
         'top_ten': top_ten_issues
     }
     return render(request, 'app/dashboard.html', context)
 
 
+def _get_status_dict(project_id):
+    """ 统计项目中各状态的问题数量。 """
+    status_dict = {
+        key: {"text": text, "count": 0}
+        for key, text in models.Issues.status_choices
+    }
+    issues_by_status = models.Issues.objects.filter(project_id=project_id).values('status').annotate(ct=Count('id'))
+    for item in issues_by_status:
+        status_dict[item['status']]["count"] = item['ct']
+    return status_dict
+
+
 def issues_chart(request, project_id):
     """
     为前端 highcharts 图表提供最近30天内每日创建问题数量的数据。
@@ -1,19 +1,33 @@
 import json
-import requests
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
 from django.db import transaction
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
 from django.urls import reverse
+from django.utils.http import content_disposition_header
 from django.views.decorators.csrf import csrf_exempt
 
 from app import models
-from app.forms.file import FolderModelForm, FileModelForm
-from utils.tencent.cos import CosManager
+from app.forms.file import FolderModelForm, FileModelForm, FileBatchItemForm
+from utils.file_listing import FileListPager
+from utils.file_tree import get_ancestor_ids, update_folder_rollup, walk_subtree
+from utils.quota import reserve_space, commit_space, release_space, cancel_reservation, SpaceLimitExceeded
+from utils.storage.base import StorageFileNotFound
+from utils.storage.factory import get_storage
+from utils.thumbnail import submit_file_thumbnails, get_thumbnail_key
+from utils.zip_stream import iter_zip_stream
 
 def file(request, project_id):
     """
     文件库主视图。
-    - GET: 显示文件和文件夹列表，支持进入子文件夹。
+    - GET: 显示文件和文件夹列表的第一页，支持进入子文件夹和按名称/大小/时间/更新者排序。
     - POST: (AJAX) 处理新建或编辑文件夹。
     """
     folder_id = request.GET.get('folder', "")
@@ -46,64 +60,306 @@ def file(request, project_id):
         breadcrumb_list.insert(0, {'id': parent.id, 'name': parent.name})
         parent = parent.parent
 
-    queryset = models.FileRepository.objects.filter(project_id=project_id)
-    file_object_list = queryset.filter(parent=parent_object).order_by('-file_type',
-                                                                      'name') if parent_object else queryset.filter(
-        parent__isnull=True).order_by('-file_type', 'name')
+    pager = _get_file_list_pager(request, project_id, parent_object)
+    file_object_list, next_cursor = pager.get_page()
 
     form = FolderModelForm(request, parent_object=parent_object)
+    storage_client = get_storage(region=request.tracer.project.region)
     context = {
         'form': form,
         'file_object_list': file_object_list,
         'breadcrumb_list': breadcrumb_list,
         'folder_object': parent_object,
+        'sort': pager.sort,
+        'order': pager.order,
+        'next_cursor': next_cursor,
+        'file_post_batch_size': settings.FILE_POST_BATCH_SIZE,
+        'upload_domain': storage_client.get_upload_domain(request.get_host()),
     }
     return render(request, 'app/file.html', context)
 
+def file_list(request, project_id):
+    """
+    (AJAX) 按游标分页返回文件列表，供文件库页面滚动加载。
+    参数: folder（父目录ID）、sort、order、cursor（上一页返回的 next_cursor）。
+    """
+    folder_id = request.GET.get('folder', "")
+    parent_object = None
+    if folder_id.isdecimal():
+        parent_object = get_object_or_404(models.FileRepository, id=int(folder_id), file_type=2, project_id=project_id)
+
+    pager = _get_file_list_pager(request, project_id, parent_object)
+    file_object_list, next_cursor = pager.get_page()
+    data_list = [
+        {
+            'id': item.id,
+            'name': item.name,
+            'file_type': item.file_type,
+            'file_size': item.file_size,
+            'total_size': item.total_size,
+            'file_count': item.file_count,
+            'thumbnail_path': item.thumbnail_path,
+            'username': item.update_user.username,
+            'datetime': item.update_datetime.strftime('%Y-%m-%d %H:%M'),
+            'download_url': _get_download_url(project_id, item),
+        }
+        for item in file_object_list
+    ]
+    return JsonResponse({'status': True, 'data': data_list, 'next_cursor': next_cursor})
+
+
+def _get_download_url(project_id, item):
+    """ 文件返回单文件下载地址，文件夹返回打包下载地址。 """
+    if item.file_type == 2:
+        return reverse('file_download_folder', kwargs={'project_id': project_id, 'folder_id': item.id})
+    return reverse('file_download', kwargs={'project_id': project_id, 'file_id': item.id})
+
+
+def _get_file_list_pager(request, project_id, parent_object):
+    """ 根据请求参数构造文件列表分页器。 """
+    return FileListPager(
+        project_id=project_id,
+        parent_id=parent_object.id if parent_object else None,
+        sort=request.GET.get('sort'),
+        order=request.GET.get('order'),
+        cursor=request.GET.get('cursor'),
+        per_page=settings.FILE_LIST_PER_PAGE,
+    )
+
 @csrf_exempt
 def file_delete(request, project_id):
     """ (AJAX) 删除文件或文件夹（及其所有内容） """
     fid = request.GET.get('fid')
     delete_object = get_object_or_404(models.FileRepository, id=fid, project_id=project_id)
-    cos_client = CosManager(region=request.tracer.project.region)
+    storage_client = get_storage(region=request.tracer.project.region)
 
     try:
         # 使用数据库事务确保数据一致性
         with transaction.atomic():
             # 情况一：删除的是文件
             if delete_object.file_type == 1:
-                request.tracer.project.use_space -= delete_object.file_size
-                request.tracer.project.save()
-                cos_client.delete_file(request.tracer.project.bucket, delete_object.key)
+                release_space(project_id, delete_object.file_size)
+                update_folder_rollup(delete_object.parent_id, -delete_object.file_size, -1)
+                storage_client.delete_file(request.tracer.project.bucket, delete_object.key)
+                if delete_object.thumbnail_path:
+                    storage_client.delete_file(request.tracer.project.bucket, get_thumbnail_key(delete_object.key))
                 delete_object.delete()
             # 情况二：删除的是文件夹
             else:
                 total_size = 0
+                file_count = 0
                 key_list = []
-                folder_list = [delete_object]
-                for folder in folder_list:
-                    children = models.FileRepository.objects.filter(project_id=project_id, parent=folder)
-                    for child in children:
-                        if child.file_type == 2:
-                            folder_list.append(child)
-                        else:
-                            total_size += child.file_size
-                            key_list.append({"Key": child.key})
+                for child in walk_subtree(project_id, delete_object.id):
+                    if child.file_type == 1:
+                        total_size += child.file_size
+                        file_count += 1
+                        key_list.append({"Key": child.key})
+                        if child.thumbnail_path:
+                            key_list.append({"Key": get_thumbnail_key(child.key)})
 
                 if key_list:
-                    cos_client.delete_file_list(request.tracer.project.bucket, key_list)
-                if total_size:
-                    request.tracer.project.use_space -= total_size
-                    request.tracer.project.save()
+                    storage_client.delete_file_list(request.tracer.project.bucket, key_list)
+                release_space(project_id, total_size)
+                update_folder_rollup(delete_object.parent_id, -total_size, -file_count)
                 delete_object.delete()
     except Exception as e:
         return JsonResponse({'status': False, 'error': "删除失败，请稍后重试。"})
 
     return JsonResponse({'status': True})
 
+@csrf_exempt
+def file_move(request, project_id):
+    """
+    (AJAX) 批量移动文件和文件夹。
+    只修改元数据：一条 UPDATE 修改所有节点的 parent，文件数据和子孙节点都不需要改动。
+    请求体格式: {"ids": [文件/文件夹ID, ...], "target": 目标文件夹ID（为空表示根目录）}
+    """
+    post_data = json.loads(request.body.decode('utf-8'))
+    move_list, target_object, ancestor_dict, error = _get_bulk_file_objects(project_id, post_data, is_move=True)
+    if error:
+        return JsonResponse({'status': False, 'error': error})
+
+    target_id = target_object.id if target_object else None
+    move_list = [item for item in move_list if item.parent_id != target_id]
+    if not move_list:
+        return JsonResponse({'status': True, 'data': {'count': 0}})
+
+    try:
+        with transaction.atomic():
+            models.FileRepository.objects.filter(id__in=[item.id for item in move_list]).update(parent_id=target_id)
+
+            size_dict = defaultdict(int)
+            count_dict = defaultdict(int)
+            for item in move_list:
+                size, count = _get_rollup(item)
+                size_dict[item.parent_id] += size
+                count_dict[item.parent_id] += count
+            for parent_id in size_dict:
+                update_folder_rollup(parent_id, -size_dict[parent_id], -count_dict[parent_id],
+                                     ancestor_ids=ancestor_dict[parent_id])
+            update_folder_rollup(target_id, sum(size_dict.values()), sum(count_dict.values()))
+    except Exception as e:
+        return JsonResponse({'status': False, 'error': "移动失败，请稍后重试。"})
+
+    return JsonResponse({'status': True, 'data': {'count': len(move_list)}})
+
+
+@csrf_exempt
+def file_copy(request, project_id):
+    """
+    (AJAX) 批量复制文件和文件夹（包含所有子孙节点）。
+    - 先预留项目空间，再通过存储的服务端复制在线程池中并发复制对象，文件数据不经过浏览器和应用服务器。
+    - 新记录按层级 bulk_create，项目已用空间和目标目录的汇总各只更新一次。
+    请求体格式: {"ids": [文件/文件夹ID, ...], "target": 目标文件夹ID（为空表示根目录）}
+    """
+    post_data = json.loads(request.body.decode('utf-8'))
+    copy_list, target_object, _, error = _get_bulk_file_objects(project_id, post_data, is_move=False)
+    if error:
+        return JsonResponse({'status': False, 'error': error})
+
+    project = request.tracer.project
+    target_id = target_object.id if target_object else None
+    children_dict = defaultdict(list)
+    for child in walk_subtree(project_id, [item.id for item in copy_list if item.file_type == 2]):
+        children_dict[child.parent_id].append(child)
+    file_list = [item for item in copy_list if item.file_type == 1]
+    file_list += [child for children in children_dict.values() for child in children if child.file_type == 1]
+
+    total_size = sum(item.file_size for item in file_list)
+    total_project_space = request.tracer.price_policy.project_space * 1024 * 1024 * 1024
+    reservation = reserve_space(project, request.tracer.user, total_size, total_project_space)
+    if not reservation:
+        return JsonResponse({'status': False, 'error': '项目容量超过限制，请升级套餐。'})
+
+    storage_client = get_storage(region=project.region)
+    # 新 key 只保留原文件的扩展名，长度不受文件名影响，不会超过 FileRepository.key 的长度限制
+    key_dict = {
+        item.id: f"{int(time.time() * 1000)}-{uuid.uuid4().hex}{os.path.splitext(item.name)[1][:16]}"
+        for item in file_list
+    }
+    copy_pairs = [(item.key, key_dict[item.id]) for item in file_list]
+    copy_pairs += [
+        (get_thumbnail_key(item.key), get_thumbnail_key(key_dict[item.id]))
+        for item in file_list if item.thumbnail_path
+    ]
+    try:
+        with ThreadPoolExecutor(max_workers=settings.COS_COPY_MAX_WORKERS) as executor:
+            list(executor.map(lambda pair: storage_client.copy_file(project.bucket, *pair), copy_pairs))
+    except Exception as e:
+        if copy_pairs:
+            storage_client.delete_file_list(project.bucket, [{'Key': key} for _, key in copy_pairs])
+        cancel_reservation(project.id, reservation.id)
+        return JsonResponse({'status': False, 'error': "复制失败，请稍后重试。"})
+
+    try:
+        with transaction.atomic():
+            new_parent_dict = {item.id: target_id for item in copy_list}
+            level = copy_list
+            while level:
+                instance_list = models.FileRepository.objects.bulk_create([
+                    _copy_file_object(request, storage_client, item, new_parent_dict[item.id], key_dict.get(item.id))
+                    for item in level
+                ])
+                next_level = []
+                for item, instance in zip(level, instance_list):
+                    for child in children_dict.get(item.id, []):
+                        new_parent_dict[child.id] = instance.id
+                        next_level.append(child)
+                level = next_level
+
+            commit_space(project.id, request.tracer.user, total_size, total_project_space,
+                         reservation_id=reservation.id)
+            size_count_list = [_get_rollup(item) for item in copy_list]
+            update_folder_rollup(target_id, sum(size for size, _ in size_count_list),
+                                 sum(count for _, count in size_count_list))
+    except Exception as e:
+        storage_client.delete_file_list(project.bucket, [{'Key': key} for _, key in copy_pairs])
+        cancel_reservation(project.id, reservation.id)
+        return JsonResponse({'status': False, 'error': "复制失败，请稍后重试。"})
+
+    return JsonResponse({'status': True, 'data': {'count': len(new_parent_dict), 'file_count': len(file_list)}})
+
+
+def _get_bulk_file_objects(project_id, post_data, is_move):
+    """
+    解析并校验批量移动/复制请求。
+    - 所有节点必须属于当前项目，目标必须是当前项目中的文件夹（或根目录）。
+    - 不能把文件夹移动/复制到其自身或子孙文件夹中，也不能同时选择文件夹和它的子孙节点。
+    - 目标目录下不能出现同名文件夹。移动时被移动的文件夹本身不算重名；复制时原文件夹仍然保留，
+      复制到原来的父目录会产生同名文件夹，需要拒绝。
+
+    :return: (节点列表, 目标文件夹, {原父目录ID: 原祖先链}, 错误信息)
+    """
+    id_set = {int(item) for item in post_data.get('ids') or [] if str(item).isdecimal()}
+    if not id_set:
+        return None, None, None, '请选择要操作的文件或文件夹。'
+
+    object_list = list(models.FileRepository.objects.filter(project_id=project_id, id__in=id_set))
+    if len(object_list) != len(id_set):
+        return None, None, None, '选择的文件或文件夹不存在。'
+
+    target_object = None
+    target_id = str(post_data.get('target') or '')
+    if target_id.isdecimal():
+        target_object = models.FileRepository.objects.filter(id=int(target_id), file_type=2,
+                                                             project_id=project_id).first()
+        if not target_object:
+            return None, None, None, '目标文件夹不存在。'
+
+    ancestor_dict = {item.parent_id: get_ancestor_ids(item.parent_id) for item in object_list}
+    if any(item_id in ancestor_ids for ancestor_ids in ancestor_dict.values() for item_id in id_set):
+        return None, None, None, '不能同时选择文件夹和其中的内容。'
+
+    folder_id_set = {item.id for item in object_list if item.file_type == 2}
+    if folder_id_set & set(get_ancestor_ids(target_object.id if target_object else None)):
+        return None, None, None, '不能将文件夹移动或复制到其自身或子文件夹中。'
+
+    folder_names = [item.name for item in object_list if item.file_type == 2]
+    queryset = models.FileRepository.objects.filter(
+        project_id=project_id, parent=target_object, file_type=2, name__in=folder_names
+    )
+    if is_move:
+        queryset = queryset.exclude(id__in=folder_id_set)
+    exists = queryset.exists()
+    if exists or len(set(folder_names)) != len(folder_names):
+        return None, None, None, '目标目录下已存在同名文件夹。'
+
+    return object_list, target_object, ancestor_dict, None
+
+
+def _get_rollup(item):
+    """ 返回节点计入祖先汇总的 (文件大小, 文件数量)。 """
+    if item.file_type == 2:
+        return item.total_size, item.file_count
+    return item.file_size, 1
+
+
+def _copy_file_object(request, storage_client, item, parent_id, key):
+    """ 构造节点副本（未保存），文件使用复制后的新 key。 """
+    instance = models.FileRepository(
+        project_id=item.project_id,
+        file_type=item.file_type,
+        name=item.name,
+        parent_id=parent_id,
+        update_user=request.tracer.user,
+        total_size=item.total_size,
+        file_count=item.file_count,
+    )
+    if item.file_type == 1:
+        instance.key = key
+        instance.file_size = item.file_size
+        instance.file_path = storage_client.get_url(request.tracer.project.bucket, key)
+        if item.thumbnail_path:
+            instance.thumbnail_path = storage_client.get_url(request.tracer.project.bucket, get_thumbnail_key(key))
+    return instance
+
+
 @csrf_exempt
 def cos_credential(request, project_id):
-    """ (AJAX) 获取腾讯云COS上传临时凭证，并在获取前进行容量校验 """
+    """
+    (AJAX) 获取腾讯云COS上传临时凭证。
+    签发前原子地预留本次上传所需的空间，返回的预留ID在提交文件时用于转为已使用空间。
+    """
     file_list = json.loads(request.body.decode('utf-8'))
     per_file_limit = request.tracer.price_policy.per_file_size * 1024 * 1024
     total_project_space = request.tracer.price_policy.project_space * 1024 * 1024 * 1024
@@ -114,12 +370,13 @@ def cos_credential(request, project_id):
             return JsonResponse({'status': False, 'error': msg})
         total_upload_size += item['size']
 
-    if request.tracer.project.use_space + total_upload_size > total_project_space:
+    reservation = reserve_space(request.tracer.project, request.tracer.user, total_upload_size, total_project_space)
+    if not reservation:
         return JsonResponse({'status': False, 'error': '项目容量超过限制，请升级套餐。'})
 
-    cos_client = CosManager(region=request.tracer.project.region)
-    data_dict = cos_client.get_credential(request.tracer.project.bucket)
-    return JsonResponse({'status': True, 'data': data_dict})
+    storage_client = get_storage(region=request.tracer.project.region)
+    data_dict = storage_client.get_credential(request.tracer.project.bucket)
+    return JsonResponse({'status': True, 'data': data_dict, 'reservation': reservation.id})
 
 
 @csrf_exempt
@@ -137,12 +394,16 @@ def file_post(request, project_id):
                     'update_user': request.tracer.user
                 })
                 instance = models.FileRepository.objects.create(**cleaned_data)
-                request.tracer.project.use_space += cleaned_data['file_size']
-                request.tracer.project.save()
-
+                commit_space(project_id, request.tracer.user, cleaned_data['file_size'],
+                             request.tracer.price_policy.project_space * 1024 * 1024 * 1024,
+                             reservation_id=_get_reservation_id(request.POST.get('reservation')))
+                update_folder_rollup(instance.parent_id, instance.file_size, 1)
+        except SpaceLimitExceeded:
+            return JsonResponse({'status': False, 'error': '项目容量超过限制，请升级套餐。'})
         except Exception as e:
             return JsonResponse({'status': False, 'error': "文件信息写入失败。"})
 
+        submit_file_thumbnails(request.tracer.project, [instance])
         result = {
             'id': instance.id,
             'name': instance.name,
@@ -156,14 +417,144 @@ def file_post(request, project_id):
     return JsonResponse({'status': False, 'error': form.errors})
 
 
-def file_download(request, project_id, file_id):
-    """ 文件下载视图，通过后端代理从COS下载 """
-    file_object = get_object_or_404(models.FileRepository, id=file_id, project_id=project_id)
-    res = requests.get(file_object.file_path, stream=True)
+@csrf_exempt
+def file_post_batch(request, project_id):
+    """
+    (AJAX) 批量将已上传到COS的文件元数据写入数据库。
+    - 父目录只校验一次，存储中的元数据通过有界线程池并发核对。
+    - 所有文件通过 bulk_create 一次插入，预留空间通过 F() 一次转为已使用空间。
+    请求体格式: {"parent": 父目录ID, "reservation": 预留ID, "files": [{"name", "key", "file_size", "etag"}, ...]}
+    """
+    post_data = json.loads(request.body.decode('utf-8'))
+    file_list = post_data.get('files') or []
+    if not file_list:
+        return JsonResponse({'status': False, 'error': '没有需要提交的文件。'})
+    if len(file_list) > settings.FILE_POST_BATCH_SIZE:
+        return JsonResponse({'status': False, 'error': f"单次最多提交{settings.FILE_POST_BATCH_SIZE}个文件。"})
+
+    parent_object = None
+    parent_id = str(post_data.get('parent') or '')
+    if parent_id.isdecimal():
+        parent_object = models.FileRepository.objects.filter(id=int(parent_id), file_type=2,
+                                                             project_id=project_id).first()
+        if not parent_object:
+            return JsonResponse({'status': False, 'error': '父目录不存在。'})
+
+    project = request.tracer.project
+    form_list = [FileBatchItemForm(request, data=item) for item in file_list]
+    errors = {index: form.errors for index, form in enumerate(form_list) if not form.is_valid()}
+
+    if not errors:
+        storage_client = get_storage(region=project.region)
+        metadata_dict = storage_client.check_file_list(
+            bucket=project.bucket,
+            key_list=[form.cleaned_data['key'] for form in form_list],
+            max_workers=settings.COS_CHECK_MAX_WORKERS
+        )
+        for index, form in enumerate(form_list):
+            cos_metadata = metadata_dict.get(form.cleaned_data['key'])
+            if cos_metadata is None:
+                form.add_error('key', '文件不存在或上传凭证无效。')
+            else:
+                form.check_metadata(cos_metadata, storage_client)
+            if form.errors:
+                errors[index] = form.errors
+
+    if errors:
+        return JsonResponse({'status': False, 'error': errors})
+
+    try:
+        with transaction.atomic():
+            instance_list = []
+            total_size = 0
+            for form in form_list:
+                cleaned_data = form.cleaned_data
+                cleaned_data.pop('etag')
+                instance_list.append(models.FileRepository(
+                    project=project,
+                    file_type=1,
+                    parent=parent_object,
+                    update_user=request.tracer.user,
+                    **cleaned_data
+                ))
+                total_size += cleaned_data['file_size']
+            instance_list = models.FileRepository.objects.bulk_create(instance_list)
+            commit_space(project.id, request.tracer.user, total_size,
+                         request.tracer.price_policy.project_space * 1024 * 1024 * 1024,
+                         reservation_id=_get_reservation_id(post_data.get('reservation')))
+            update_folder_rollup(parent_object.id if parent_object else None, total_size, len(instance_list))
+    except SpaceLimitExceeded:
+        return JsonResponse({'status': False, 'error': '项目容量超过限制，请升级套餐。'})
+    except Exception as e:
+        return JsonResponse({'status': False, 'error': "文件信息写入失败。"})
 
-    if res.status_code != 200:
+    submit_file_thumbnails(project, instance_list)
+    result = [
+        {
+            'id': instance.id,
+            'name': instance.name,
+            'file_size': instance.file_size,
+            'username': request.tracer.user.username,
+            'datetime': instance.update_datetime.strftime('%Y-%m-%d %H:%M'),
+            'download_url': reverse('file_download', kwargs={'project_id': project_id, 'file_id': instance.id}),
+        }
+        for instance in instance_list
+    ]
+    return JsonResponse({'status': True, 'data': result})
+
+
+def _get_reservation_id(value):
+    """ 从请求参数中解析空间预留ID，非法值视为没有预留。 """
+    value = str(value or '')
+    return int(value) if value.isdecimal() else None
+
+
+def file_download(request, project_id, file_id):
+    """
+    文件下载视图，通过后端代理从存储中流式读取文件。
+    本地存储后端返回真实文件句柄，可由服务器使用 sendfile 发送。
+    """
+    file_object = get_object_or_404(models.FileRepository, id=file_id, project_id=project_id, file_type=1)
+    storage_client = get_storage(region=request.tracer.project.region)
+    try:
+        stream = storage_client.open_file(request.tracer.project.bucket, file_object.key)
+    except StorageFileNotFound:
         return HttpResponse("文件获取失败", status=404)
 
-    response = HttpResponse(res.iter_content(chunk_size=8192), content_type=res.headers['Content-Type'])
-    response['Content-Disposition'] = f'attachment; filename="{file_object.name}"'
-    return response
\ No newline at end of file
+    return FileResponse(stream, as_attachment=True, filename=file_object.name)
+
+
+def file_download_folder(request, project_id, folder_id):
+    """
+    将文件夹打包为 ZIP 压缩包下载。
+    边从存储中读取文件边压缩边发送，不在内存或磁盘中暂存整个压缩包。
+    """
+    folder_object = get_object_or_404(models.FileRepository, id=folder_id, project_id=project_id, file_type=2)
+    project = request.tracer.project
+    storage_client = get_storage(region=project.region)
+
+    def iter_entries():
+        path_dict = {folder_object.id: folder_object.name}
+        yield folder_object.name, folder_object.update_datetime, None
+        for child in walk_subtree(project_id, folder_object.id):
+            arcname = f"{path_dict[child.parent_id]}/{child.name}"
+            if child.file_type == 2:
+                path_dict[child.id] = arcname
+                yield arcname, child.update_datetime, None
+            else:
+                yield arcname, child.update_datetime, partial(_open_file_or_none, storage_client, project.bucket, child.key)
+
+    response = StreamingHttpResponse(
+        iter_zip_stream(iter_entries(), prefetch=settings.ZIP_PREFETCH_COUNT),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = content_disposition_header(True, f"{folder_object.name}.zip")
+    return response
+
+
+def _open_file_or_none(storage_client, bucket, key):
+    """ 打开存储中的文件，文件已不存在时返回 None，打包时跳过该文件。 """
+    try:
+        return storage_client.open_file(bucket, key)
+    except StorageFileNotFound:
+        return None
@@ -1,18 +1,38 @@
+import csv
 import datetime
 import json
 import uuid
 import hashlib
 
 from django.conf import settings
-from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
+from django.utils.functional import SimpleLazyObject
 from django.urls import reverse
+from django.utils.http import content_disposition_header
 from django.views.decorators.csrf import csrf_exempt
 
 from app import models
-from app.forms.issues import IssuesModelForm, InviteModelForm
+from app.forms.issues import IssuesModelForm, IssuesReplyModelForm, InviteModelForm
 from utils.pagination import Pagination
-from utils.issues_filter import CheckFilter
+from utils.issues_export import iter_issues_rows, iter_csv, iter_ndjson
+from utils.issues_filter import CheckFilter, compile_filter, normalize_filter_params
+from utils.issues_import import IssuesImporter, iter_import_rows
+from utils.issues_timeline import IssuesTimelinePager, build_record_tree
+from utils.issues_tree import get_issues_tree, invalidate_issues_tree
+from utils.notification import emit_issues_events
+from utils.realtime import iter_project_events, publish_issues_event
+from utils.fragment_cache import bump_project_version
+from utils.project_index import get_project_roster, invalidate_project_members_index
+
+# 问题列表支持的筛选参数
+ISSUES_FILTERS = [
+    'status', 'priority', 'assign', 'attention', 'issues_type', 'module', 'create_datetime', 'end_date', 'subject'
+]
+
 
 def issues(request, project_id):
     """
@@ -24,13 +44,17 @@ def issues(request, project_id):
             form.instance.project = request.tracer.project
             form.instance.creator = request.tracer.user
             form.save()
+            if form.instance.parent_id:
+                invalidate_issues_tree([form.instance.id])
+            emit_issues_events([(form.instance.id, request.tracer.user.id, f"新建问题: {form.instance.subject}")])
+            publish_issues_event(project_id, 'create', [form.instance.id], request.tracer.user, form.instance.subject)
+            bump_project_version(project_id)
             return JsonResponse({'status': True})
         return JsonResponse({'status': False, 'error': form.errors})
-    allowed_filters = ['status', 'priority', 'assign', 'attention']
-    filter_handler = CheckFilter(allowed_filters, request)
+    filter_handler = CheckFilter(ISSUES_FILTERS, request)
     query_conditions = filter_handler.get_query_conditions()
 
-    queryset = models.Issues.objects.filter(project_id=project_id, **query_conditions)
+    queryset = models.Issues.objects.filter(query_conditions, project_id=project_id)
     page_object = Pagination(
         current_page=request.GET.get('page'),
         all_count=queryset.count(),
@@ -45,8 +69,13 @@ def issues(request, project_id):
         'form': form,
         'issues_object_list': issues_object_list,
         'page_html': page_object.page_html(),
-        'filter_choices': filter_handler.get_filter_choices(),
+        # 延迟计算：筛选面板命中片段缓存时不再查询项目成员
+        'filter_choices': SimpleLazyObject(filter_handler.get_filter_choices),
+        'filter_query': filter_handler.get_filter_query(),
+        'realtime_enabled': settings.REALTIME_ENABLED,
         'invite_form': invite_form,
+        'status_choices': models.Issues.status_choices,
+        'priority_choices': models.Issues.priority_choices,
     }
     return render(request, 'app/issues.html', context)
 
@@ -58,140 +87,432 @@ def issues_detail(request, project_id, issues_id):
     form = IssuesModelForm(request=request, instance=issues_object)
     context = {
         'form': form,
-        'issues_object': issues_object
+        'issues_object': issues_object,
+        'realtime_enabled': settings.REALTIME_ENABLED,
     }
     return render(request, 'app/issues_detail.html', context)
 
 
+@csrf_exempt
+def issues_record(request, project_id, issues_id):
+    """
+    (AJAX) 问题的操作记录时间线。
+    - GET: 按游标从新到旧分页返回记录，参数: reply_type（可选，1 变更记录 / 2 回复）、cursor（上一页返回的 next_cursor）。
+      每页记录在内存中一次组装成回复树，返回 {data: 顶层记录列表（从新到旧）, next_cursor, latest_cursor}。
+      带 since 参数（latest_cursor）时只返回更新的记录 {data: 顶层记录列表（从旧到新）, latest_cursor, reload}，
+      reload 为 true 表示新记录太多或游标无效，需要重新加载第一页。
+    - POST: 发表回复，参数: content、reply（被回复的记录ID，可选）。
+    """
+    issues_object = get_object_or_404(models.Issues, id=issues_id, project_id=project_id)
+    if request.method == 'POST':
+        form = IssuesReplyModelForm(data=request.POST)
+        # 只能回复同一个问题下的记录
+        form.fields['reply'].queryset = models.IssuesReply.objects.filter(issues=issues_object)
+        if not form.is_valid():
+            return JsonResponse({'status': False, 'error': form.errors})
+        form.instance.reply_type = 2
+        form.instance.issues = issues_object
+        form.instance.creator = request.tracer.user
+        record = form.save()
+        emit_issues_events([(issues_object.id, request.tracer.user.id, f"回复: {record.content}")])
+        publish_issues_event(project_id, 'reply', [issues_object.id], request.tracer.user, record.content)
+        return JsonResponse({'status': True, 'data': _get_record_data(record, request.tracer.user)})
+
+    pager = IssuesTimelinePager(
+        issues_object.id,
+        reply_type=request.GET.get('reply_type'),
+        cursor=request.GET.get('cursor'),
+        per_page=settings.ISSUES_RECORD_PER_PAGE,
+    )
+    since = request.GET.get('since')
+    if since:
+        record_list, reload = pager.get_newer(since)
+        data_list = [_get_record_data(record, record.creator) for record in record_list]
+        return JsonResponse({
+            'status': True,
+            'data': build_record_tree(data_list),
+            'latest_cursor': pager.encode_cursor(record_list[-1]) if record_list else since,
+            'reload': reload,
+        })
+
+    record_list, next_cursor = pager.get_page()
+    data_list = [_get_record_data(record, record.creator) for record in record_list]
+    return JsonResponse({
+        'status': True,
+        'data': build_record_tree(data_list, newest_first=True),
+        'next_cursor': next_cursor,
+        'latest_cursor': pager.encode_cursor(record_list[0]) if record_list and not pager.cursor else None,
+    })
+
+
+def issues_parent_search(request, project_id):
+    """
+    (AJAX) 父问题下拉框的异步搜索，返回最多 ISSUES_PARENT_SEARCH_LIMIT 个匹配的问题。
+    参数: q（“#ID”或纯数字按问题ID匹配，同时按主题前缀匹配）、exclude（编辑中的问题ID，不能作为自己的父问题）。
+    """
+    keyword = request.GET.get('q', '').strip()
+    queryset = models.Issues.objects.filter(project_id=project_id)
+    exclude_id = request.GET.get('exclude', '')
+    if exclude_id.isdecimal():
+        queryset = queryset.exclude(id=int(exclude_id))
+
+    if keyword:
+        condition = Q(subject__startswith=keyword)
+        issues_id = keyword.lstrip('#')
+        if issues_id.isdecimal():
+            condition |= Q(id=int(issues_id))
+        queryset = queryset.filter(condition)
+
+    limit = settings.ISSUES_PARENT_SEARCH_LIMIT
+    data_list = [
+        {'id': issues_id, 'text': f'#{issues_id} {subject}'}
+        for issues_id, subject in queryset.order_by('-id').values_list('id', 'subject')[:limit]
+    ]
+    return JsonResponse({'status': True, 'data': data_list})
+
+
+def issues_tree(request, project_id, issues_id):
+    """
+    (AJAX) 问题的子问题树：全部子孙问题（一条递归查询）以及按状态汇总的完成度，结果按根问题缓存。
+    """
+    get_object_or_404(models.Issues, id=issues_id, project_id=project_id)
+    return JsonResponse({'status': True, 'data': get_issues_tree(issues_id)})
+
+
+async def issues_stream(request, project_id):
+    """
+    项目问题变更的实时推送（Server-Sent Events），推送问题的创建、修改和回复。
+    路由只在 REALTIME_ENABLED 开启时注册。WSGI 会先把异步事件流整体读完再返回，
+    请求不是经由ASGI到达时直接返回 503，不占用工作线程。
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse('实时推送需要以ASGI方式部署', status=503)
+    response = StreamingHttpResponse(iter_project_events(project_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # 禁止 nginx 缓冲事件流
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def issues_export(request, project_id):
+    """
+    按问题列表当前的筛选条件流式导出问题，内存占用与导出行数无关。
+    参数: format（csv 或 ndjson，默认 csv），其余参数与问题列表的筛选参数相同。
+    """
+    export_format = 'ndjson' if request.GET.get('format') == 'ndjson' else 'csv'
+    filter_handler = CheckFilter(ISSUES_FILTERS, request)
+    queryset = models.Issues.objects.filter(filter_handler.get_query_conditions(), project_id=project_id)
+    row_iterator = iter_issues_rows(queryset, request.tracer.project, settings.ISSUES_EXPORT_CHUNK_SIZE)
+
+    if export_format == 'ndjson':
+        response = StreamingHttpResponse(iter_ndjson(row_iterator), content_type='application/x-ndjson; charset=utf-8')
+    else:
+        response = StreamingHttpResponse(iter_csv(row_iterator), content_type='text/csv; charset=utf-8')
+    filename = f"{request.tracer.project.name}_问题_{datetime.date.today():%Y%m%d}.{export_format}"
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
+
+
+@csrf_exempt
+def issues_import(request, project_id):
+    """
+    (AJAX) 从上传的 CSV 或 JSON/NDJSON 文件批量导入问题，创建者为当前用户。
+    表头可以是字段名或导出文件的中文表头；问题类型、模块、指派和关注者可以填写名称或ID。
+    有错误的行被跳过，返回创建的问题数和前 ISSUES_IMPORT_MAX_ERRORS 行的错误信息。
+    """
+    file_object = request.FILES.get('file')
+    if request.method != 'POST' or not file_object:
+        return JsonResponse({'status': False, 'error': '请选择要导入的文件'})
+
+    file_format = 'json' if file_object.name.lower().endswith(('.json', '.ndjson', '.jsonl')) else 'csv'
+    importer = IssuesImporter(
+        request.tracer.project, request.tracer.user,
+        chunk_size=settings.ISSUES_IMPORT_CHUNK_SIZE, max_errors=settings.ISSUES_IMPORT_MAX_ERRORS,
+    )
+    try:
+        created = importer.run(iter_import_rows(file_object, file_format))
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return JsonResponse({'status': False, 'error': f'文件格式错误: {e}'})
+    return JsonResponse({'status': True, 'data': {
+        'created': created, 'error_count': importer.error_count, 'errors': importer.error_list
+    }})
+
+
+# 可以在问题列表中批量修改的字段
+BULK_FIELDS = {'status', 'priority', 'assign', 'attention'}
+
+# 子问题树中显示的字段，修改后需要失效所在的子问题树缓存
+TREE_FIELDS = {'subject', 'status', 'priority', 'assign', 'parent'}
+
+
+@csrf_exempt
+def issues_bulk(request, project_id):
+    """
+    (AJAX) 批量修改问题：修改状态（如批量关闭）、修改优先级、重新指派、添加关注者。
+    请求体格式:
+        {"ids": [问题ID, ...]} 或 {"filter": "status=1&assign=3"}（问题列表当前的筛选条件，空字符串表示全部问题），
+        两者必须且只能提供一个，
+        "name": "status" | "priority" | "assign" | "attention"，
+        "value": 新值（attention 为要添加的用户ID列表）
+    - 按块执行 UPDATE ... WHERE id IN (...)，只修改值确实发生变化的问题，每块的变更记录一次 bulk_create。
+    - 返回匹配的问题数和实际修改的问题数。
+    """
+    post_data = json.loads(request.body.decode('utf-8'))
+    if not isinstance(post_data, dict):
+        return JsonResponse({'status': False, 'error': '请求格式错误'})
+    name = post_data.get('name')
+    if name not in BULK_FIELDS:
+        return JsonResponse({'status': False, 'error': '不支持批量修改该字段'})
+
+    # 借用单个问题的校验逻辑，把新值设置到一个不保存的问题对象上
+    field_object = models.Issues._meta.get_field(name)
+    probe = models.Issues(project_id=project_id)
+    m2m_dict = {}
+    content, error = _apply_change(request, probe, field_object, post_data.get('value'), m2m_dict)
+    if error:
+        return JsonResponse({'status': False, 'error': error})
+    if name == 'attention':
+        if not m2m_dict['attention']:
+            return JsonResponse({'status': False, 'error': '请选择要添加的关注者'})
+        content = content.replace('更新为', '添加', 1)
+
+    # 必须且只能指定 ids 或 filter 其中之一，缺少时不能默认修改项目中的全部问题
+    if ('ids' in post_data) == ('filter' in post_data):
+        return JsonResponse({'status': False, 'error': '请指定要修改的问题（ids 或 filter 其中之一）'})
+    if 'filter' in post_data and not isinstance(post_data['filter'], str):
+        return JsonResponse({'status': False, 'error': '筛选条件格式错误'})
+    if 'ids' in post_data and not isinstance(post_data['ids'], list):
+        return JsonResponse({'status': False, 'error': 'ids 必须是问题ID列表'})
+
+    queryset = models.Issues.objects.filter(project_id=project_id)
+    if 'ids' in post_data:
+        id_list = [int(item) for item in post_data['ids'] if str(item).isdecimal()]
+        if not id_list:
+            return JsonResponse({'status': False, 'error': '请选择要修改的问题'})
+        queryset = queryset.filter(id__in=id_list)
+    else:
+        query_params = QueryDict(post_data['filter'])
+        queryset = queryset.filter(compile_filter(normalize_filter_params(ISSUES_FILTERS, query_params)))
+
+    id_list = list(queryset.order_by('id').values_list('id', flat=True))
+    chunk_size = settings.ISSUES_BULK_CHUNK_SIZE
+    update_datetime = datetime.datetime.now()
+    updated = 0
+    for index in range(0, len(id_list), chunk_size):
+        chunk = id_list[index:index + chunk_size]
+        with transaction.atomic():
+            if name == 'attention':
+                changed_ids = _bulk_add_attention(chunk, m2m_dict['attention'])
+                models.Issues.objects.filter(id__in=changed_ids).update(latest_update_datetime=update_datetime)
+            else:
+                value = getattr(probe, field_object.attname)
+                changed_ids = list(models.Issues.objects.filter(id__in=chunk).exclude(
+                    **{field_object.attname: value}
+                ).values_list('id', flat=True))
+                models.Issues.objects.filter(id__in=changed_ids).update(
+                    **{field_object.attname: value, 'latest_update_datetime': update_datetime}
+                )
+            models.IssuesReply.objects.bulk_create([
+                models.IssuesReply(reply_type=1, issues_id=issues_id, content=content, creator=request.tracer.user)
+                for issues_id in changed_ids
+            ])
+            if name in TREE_FIELDS and changed_ids:
+                invalidate_issues_tree(changed_ids)
+            emit_issues_events([(issues_id, request.tracer.user.id, content) for issues_id in changed_ids])
+            if changed_ids:
+                publish_issues_event(project_id, 'change', changed_ids, request.tracer.user, content)
+        updated += len(changed_ids)
+
+    if updated:
+        bump_project_version(project_id)
+    return JsonResponse({'status': True, 'data': {'matched': len(id_list), 'updated': updated}})
+
+
+def _bulk_add_attention(issues_ids, user_ids):
+    """ 为一批问题添加关注者，已经关注的跳过。返回实际新增了关注者的问题ID。 """
+    through_model = models.Issues.attention.through
+    exists = set(through_model.objects.filter(
+        issues_id__in=issues_ids, userinfo_id__in=user_ids
+    ).values_list('issues_id', 'userinfo_id'))
+    row_list = [
+        through_model(issues_id=issues_id, userinfo_id=user_id)
+        for issues_id in issues_ids for user_id in user_ids if (issues_id, user_id) not in exists
+    ]
+    through_model.objects.bulk_create(row_list, ignore_conflicts=True)
+    return sorted({row.issues_id for row in row_list})
+
+
+# 可以通过 issues_change 修改的字段
+EDITABLE_FIELDS = {
+    'subject', 'desc', 'issues_type', 'module', 'status', 'priority', 'assign', 'attention',
+    'start_date', 'end_date', 'mode', 'parent',
+}
+
+
 @csrf_exempt
 def issues_change(request, project_id, issues_id):
     """
     通过AJAX更新问题字段的通用接口。
+    - 单个字段: {"name": 字段名, "value": 值}，返回的 data 为一条变更记录。
+    - 多个字段: {"changes": [{"name": 字段名, "value": 值}, ...]}，返回的 data 为变更记录列表。
+    所有字段先一起校验，全部合法才写入：问题只 save 一次（update_fields），变更记录一次 bulk_create。
     """
     post_data = json.loads(request.body.decode('utf-8'))
-    name = post_data.get('name')
-    value = post_data.get('value')
+    is_batch = 'changes' in post_data
+    change_list = post_data.get('changes') if is_batch else [post_data]
+    if not isinstance(change_list, list) or not change_list:
+        return JsonResponse({'status': False, 'error': '数据格式错误'})
 
     issue = get_object_or_404(models.Issues, id=issues_id, project_id=project_id)
-    field_object = models.Issues._meta.get_field(name)
+    update_fields = []
+    m2m_dict = {}
+    content_list = []
+    for change in change_list:
+        name = change.get('name') if isinstance(change, dict) else None
+        if name not in EDITABLE_FIELDS:
+            return JsonResponse({'status': False, 'field': name, 'error': '不支持修改该字段'})
+
+        field_object = models.Issues._meta.get_field(name)
+        content, error = _apply_change(request, issue, field_object, change.get('value'), m2m_dict)
+        if error:
+            return JsonResponse({'status': False, 'field': name, 'error': error})
+        if not field_object.many_to_many and name not in update_fields:
+            update_fields.append(name)
+        content_list.append(content)
+
+    with transaction.atomic():
+        if TREE_FIELDS.intersection(update_fields):
+            # 保存前按旧的层级失效祖先问题的子问题树，修改了父问题时保存后再失效新的祖先
+            invalidate_issues_tree([issue.id])
+        if update_fields:
+            issue.save(update_fields=update_fields + ['latest_update_datetime'])
+        if 'parent' in update_fields:
+            invalidate_issues_tree([issue.id])
+        for name, value in m2m_dict.items():
+            getattr(issue, name).set(value)
+        record_list = models.IssuesReply.objects.bulk_create([
+            models.IssuesReply(reply_type=1, issues=issue, content=content, creator=request.tracer.user)
+            for content in content_list
+        ])
+        emit_issues_events([(issue.id, request.tracer.user.id, '\n'.join(content_list))])
+        publish_issues_event(project_id, 'change', [issue.id], request.tracer.user, '\n'.join(content_list))
+    bump_project_version(project_id)
+
+    data_list = [_get_record_data(record, request.tracer.user) for record in record_list]
+    return JsonResponse({'status': True, 'data': data_list if is_batch else data_list[0]})
 
-    # 1. 文本或日期类型
-    if field_object.get_internal_type() in ['CharField', 'TextField', 'DateField']:
-        return _update_text_or_date_field(request, issue, field_object, value)
+# ========== issues_change 的辅助函数 ==========
 
-    # 2. 外键类型
-    if field_object.get_internal_type() == 'ForeignKey':
-        return _update_fk_field(request, issue, field_object, value, project_id)
+def _get_record_data(record, creator):
+    """操作记录的JSON数据，创建者由调用方传入（当前用户或 select_related 的 creator），不需要再查询。"""
+    return {
+        'id': record.id,
+        'reply_type': record.reply_type,
+        'content': record.content,
+        'creator_name': creator.username,
+        'create_datetime': record.create_datetime.strftime('%Y-%m-%d %H:%M'),
+        'reply_id': record.reply_id
+    }
 
-    # 3. Choices类型
+
+def _apply_change(request, issue, field_object, value, m2m_dict):
+    """
+    校验一个字段的新值，并把它设置到 issue 上（多对多字段放入 m2m_dict），此时还不写数据库。
+    :return: (变更记录内容, 错误信息)
+    """
+    # 1. Choices类型（优先级是带choices的CharField，需先于文本类型判断）
     if field_object.choices:
-        return _update_choice_field(request, issue, field_object, value)
+        return _apply_choice_field(issue, field_object, value)
 
-    # 4. 多对多类型
-    if field_object.get_internal_type() == 'ManyToManyField':
-        return _update_m2m_field(request, issue, field_object, value, project_id)
+    # 2. 文本或日期类型
+    if field_object.get_internal_type() in ['CharField', 'TextField', 'DateField']:
+        return _apply_text_or_date_field(issue, field_object, value)
 
-    return JsonResponse({'status': False, 'error': '不支持的字段类型'})
+    # 3. 外键类型
+    if field_object.get_internal_type() == 'ForeignKey':
+        return _apply_fk_field(request, issue, field_object, value)
 
-# ========== issues_change 的辅助函数 ==========
+    # 4. 多对多类型
+    if field_object.get_internal_type() == 'ManyToManyField':
+        return _apply_m2m_field(request, field_object, value, m2m_dict)
 
-def _create_change_record(request, issue, content):
-    """创建一条变更记录并返回JsonResponse。"""
-    new_record = models.IssuesReply.objects.create(
-        reply_type=1, issues=issue, content=content, creator=request.tracer.user
-    )
-    response_data = {
-        'id': new_record.id,
-        'reply_type': new_record.reply_type,
-        'content': new_record.content,
-        'creator_name': new_record.creator.username,
-        'create_datetime': new_record.create_datetime.strftime('%Y-%m-%d %H:%M'),
-        'reply_id': new_record.reply_id
-    }
-    return JsonResponse({'status': True, 'data': response_data})
+    return None, '不支持的字段类型'
 
 
-def _update_text_or_date_field(request, issue, field_object, value):
-    """处理文本和日期字段的更新。"""
+def _apply_text_or_date_field(issue, field_object, value):
+    """处理文本和日期字段。"""
     if not value:
         if not field_object.null:
-            return JsonResponse({'status': False, 'error': '该字段不能为空'})
+            return None, '该字段不能为空'
         setattr(issue, field_object.name, None)
-        issue.save()
-        change_record = f"{field_object.verbose_name} 更新为空"
-    else:
-        setattr(issue, field_object.name, value)
-        issue.save()
-        change_record = f"{field_object.verbose_name} 更新为 {value}"
+        return f"{field_object.verbose_name} 更新为空", None
 
-    return _create_change_record(request, issue, change_record)
+    if field_object.get_internal_type() == 'DateField':
+        try:
+            value = datetime.date.fromisoformat(str(value))
+        except ValueError:
+            return None, '日期格式错误'
+    elif field_object.max_length and len(str(value)) > field_object.max_length:
+        return None, f'不能超过{field_object.max_length}个字符'
+
+    setattr(issue, field_object.name, value)
+    return f"{field_object.verbose_name} 更新为 {value}", None
 
 
-def _update_fk_field(request, issue, field_object, value, project_id):
-    """处理外键字段的更新。"""
+def _apply_fk_field(request, issue, field_object, value):
+    """处理外键字段。"""
     if not value:
         if not field_object.null:
-            return JsonResponse({'status': False, 'error': '该字段不能为空'})
+            return None, '该字段不能为空'
         setattr(issue, field_object.name, None)
-        issue.save()
-        change_record = f"{field_object.verbose_name} 更新为空"
+        return f"{field_object.verbose_name} 更新为空", None
+
+    if not str(value).isdecimal():
+        return None, '选择的值不存在'
+    if field_object.name == 'assign':
+        # 特殊处理 'assign' 字段：只能指派给项目成员
+        roster = dict(get_project_roster(request.tracer.project))
+        instance = models.UserInfo(id=int(value), username=roster[int(value)]) if int(value) in roster else None
     else:
-        if field_object.name == 'assign':
-            # 特殊处理 'assign' 字段
-            if int(value) == request.tracer.project.creator_id:
-                instance = request.tracer.project.creator
-            else:
-                project_user = models.ProjectUser.objects.filter(project_id=project_id, user_id=value).first()
-                instance = project_user.user if project_user else None
-        else:
-            # 通用外键处理
-            instance = field_object.remote_field.model.objects.filter(id=value, project_id=project_id).first()
+        # 通用外键处理
+        instance = field_object.remote_field.model.objects.filter(id=value, project_id=issue.project_id).first()
+        if instance and field_object.name == 'parent' and models.Issues.objects.would_create_cycle(issue.id, instance.id):
+            return None, '不能把问题自身或它的子问题设为父问题'
 
-        if not instance:
-            return JsonResponse({'status': False, 'error': '选择的值不存在'})
+    if not instance:
+        return None, '选择的值不存在'
 
-        setattr(issue, field_object.name, instance)
-        issue.save()
-        change_record = f"{field_object.verbose_name} 更新为 {str(instance)}"
+    setattr(issue, field_object.name, instance)
+    return f"{field_object.verbose_name} 更新为 {str(instance)}", None
 
-    return _create_change_record(request, issue, change_record)
 
+def _apply_choice_field(issue, field_object, value):
+    """处理带choices的字段。"""
+    choice_dict = {str(key): (key, text) for key, text in field_object.choices}
+    if str(value) not in choice_dict:
+        return None, '选择的值无效'
 
-def _update_choice_field(request, issue, field_object, value):
-    """处理带choices的字段更新。"""
-    choice_text = dict(field_object.choices).get(int(value))
-    if not choice_text:
-        return JsonResponse({'status': False, 'error': '选择的值无效'})
+    key, choice_text = choice_dict[str(value)]
+    setattr(issue, field_object.name, key)
+    return f"{field_object.verbose_name} 更新为 {choice_text}", None
 
-    setattr(issue, field_object.name, value)
-    issue.save()
-    change_record = f"{field_object.verbose_name} 更新为 {choice_text}"
-    return _create_change_record(request, issue, change_record)
 
-
-def _update_m2m_field(request, issue, field_object, value, project_id):
-    """处理多对多字段（关注者）的更新。"""
+def _apply_m2m_field(request, field_object, value, m2m_dict):
+    """处理多对多字段（关注者）。"""
     if not isinstance(value, list):
-        return JsonResponse({'status': False, 'error': '数据格式错误'})
+        return None, '数据格式错误'
 
     if not value:
-        issue.attention.set([])
-        change_record = f"{field_object.verbose_name} 更新为空"
-    else:
-        # 验证所有用户ID是否合法
-        project_users = models.ProjectUser.objects.filter(project_id=project_id)
-        allowed_user_ids = {str(u.user_id) for u in project_users}
-        allowed_user_ids.add(str(request.tracer.project.creator_id))
-
-        if not all(str(v) in allowed_user_ids for v in value):
-            return JsonResponse({'status': False, 'error': '选择的用户无效'})
+        m2m_dict[field_object.name] = []
+        return f"{field_object.verbose_name} 更新为空", None
 
-        issue.attention.set(value)
-        # 获取用户名以生成变更记录
-        usernames = list(models.UserInfo.objects.filter(id__in=value).values_list('username', flat=True))
-        change_record = f"{field_object.verbose_name} 更新为 {', '.join(usernames)}"
+    # 验证所有用户ID是否为项目成员，并从成员名单中取得用户名
+    roster = {str(user_id): username for user_id, username in get_project_roster(request.tracer.project)}
+    if not all(str(v) in roster for v in value):
+        return None, '选择的用户无效'
 
-    return _create_change_record(request, issue, change_record)
+    m2m_dict[field_object.name] = [int(v) for v in value]
+    return f"{field_object.verbose_name} 更新为 {', '.join(roster[str(v)] for v in value)}", None
 
 
 @csrf_exempt
@@ -246,6 +567,8 @@ def invite_join(request, code):
     models.ProjectUser.objects.create(user=user, project=project)
     project.join_count += 1
     project.save()
+    invalidate_project_members_index(project)
+    bump_project_version(project.id)
 
     return render(request, 'app/invite_join.html', {'project': project})
 
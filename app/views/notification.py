@@ -0,0 +1,37 @@
+import json
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from app import models
+from utils.notification import get_inbox
+
+
+def notification_list(request):
+    """
+    (AJAX) 当前用户收件箱中最近的未读通知。
+    """
+    data_list = get_inbox(request.tracer.user, settings.NOTIFICATION_INBOX_SIZE)
+    return JsonResponse({'status': True, 'data': data_list})
+
+
+@csrf_exempt
+@require_POST
+def notification_read(request):
+    """
+    (AJAX) 把通知标记为已读。
+    请求体格式: {"ids": [通知ID, ...]}，不传 ids 时把全部未读通知标记为已读。
+    """
+    post_data = json.loads(request.body.decode('utf-8') or '{}')
+    if not isinstance(post_data, dict):
+        return JsonResponse({'status': False, 'error': '请求格式错误'})
+    if 'ids' in post_data and not isinstance(post_data['ids'], list):
+        return JsonResponse({'status': False, 'error': 'ids 必须是通知ID列表'})
+    queryset = models.Notification.objects.filter(recipient=request.tracer.user, is_read=False)
+    if 'ids' in post_data:
+        id_list = [int(item) for item in post_data['ids'] if str(item).isdecimal()]
+        queryset = queryset.filter(id__in=id_list)
+    updated = queryset.update(is_read=True)
+    return JsonResponse({'status': True, 'data': {'updated': updated}})
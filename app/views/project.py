@@ -6,7 +6,8 @@ from django.views.decorators.http import require_POST
 
 from app.forms.project import ProjectModelForm
 from app import models
-from utils.tencent.cos import CosManager
+from utils.project_index import get_project_index, group_project_index, invalidate_project_index
+from utils.storage.factory import get_storage
 
 def project_list(request):
     """
@@ -20,8 +21,8 @@ def project_list(request):
                     bucket_name = f"{request.tracer.user.mobile_phone}-{int(time.time())}"
                     region = "ap-chengdu"
 
-                    cos_client = CosManager(region=region)
-                    cos_client.create_bucket(bucket=bucket_name)
+                    storage_client = get_storage(region=region)
+                    storage_client.create_bucket(bucket=bucket_name)
 
                     form.instance.creator = request.tracer.user
                     form.instance.bucket = bucket_name
@@ -33,6 +34,7 @@ def project_list(request):
                         for item in models.IssuesType.PROJECT_INIT_LIST
                     ]
                     models.IssuesType.objects.bulk_create(issue_types_to_create)
+                    invalidate_project_index([request.tracer.user.id])
             except Exception as e:
                 return JsonResponse({'status': False, 'error': "项目创建失败，请稍后重试。"})
 
@@ -40,25 +42,8 @@ def project_list(request):
 
         return JsonResponse({'status': False, 'error': form.errors})
 
-    projects_dict = {
-        'star': [],
-        'my': [],
-        'join': []
-    }
-
-    my_projects = models.Project.objects.filter(creator=request.tracer.user)
-    for proj in my_projects:
-        if proj.star:
-            projects_dict['star'].append({'value': proj, 'type': 'my'})
-        else:
-            projects_dict['my'].append(proj)
-
-    join_relations = models.ProjectUser.objects.filter(user=request.tracer.user).select_related('project')
-    for relation in join_relations:
-        if relation.star:
-            projects_dict['star'].append({'value': relation.project, 'type': 'join'})
-        else:
-            projects_dict['join'].append(relation.project)
+    # 项目列表来自Redis中缓存的用户项目索引，缓存命中时不查询数据库
+    projects_dict = group_project_index(get_project_index(request.tracer.user))
 
     form = ProjectModelForm(request)
     context = {
@@ -80,6 +65,7 @@ def project_star(request, project_type, project_id):
 
         project_obj.star = not project_obj.star
         project_obj.save()
+        invalidate_project_index([user.id])
         return JsonResponse({'status': True, 'starred': project_obj.star})
 
     elif project_type == 'join':
@@ -89,6 +75,7 @@ def project_star(request, project_type, project_id):
 
         relation_obj.star = not relation_obj.star
         relation_obj.save()
+        invalidate_project_index([user.id])
         return JsonResponse({'status': True, 'starred': relation_obj.star})
 
     else:
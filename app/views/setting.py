@@ -1,8 +1,11 @@
+from django.db import transaction
 from django.shortcuts import render, redirect
 from django.views.decorators.http import require_http_methods
 
 from app import models
-from utils.tencent.cos import CosManager
+from utils.issues_choices import invalidate_issues_choices
+from utils.project_index import invalidate_project_members_index
+from utils.storage.factory import get_storage
 
 def setting(request, project_id):
     """
@@ -30,12 +33,16 @@ def setting_delete(request, project_id):
             context['error'] = "权限不足，只有项目创建者才能执行此操作。"
             return render(request, 'app/setting_delete.html', context)
         try:
-            cos_client = CosManager(region=current_project.region)
-            cos_client.delete_bucket(bucket=current_project.bucket)
+            storage_client = get_storage(region=current_project.region)
+            storage_client.delete_bucket(bucket=current_project.bucket)
         except Exception as e:
             context['error'] = "删除云存储桶失败，请联系管理员处理。"
             return render(request, 'app/setting_delete.html', context)
-        models.Project.objects.filter(id=project_id).delete()
+        # 成员名单在删除前取出；缓存等删除提交后再清除，避免并发请求把已删除的项目重新写入缓存
+        with transaction.atomic():
+            invalidate_project_members_index(current_project)
+            invalidate_issues_choices(current_project.id)
+            models.Project.objects.filter(id=project_id).delete()
 
         return redirect("project_list")
 
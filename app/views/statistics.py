@@ -1,8 +1,17 @@
+import datetime
+import json
+
+from django.conf import settings
 from django.db.models import Count
 from django.http import JsonResponse
 from django.shortcuts import render
 
 from app import models
+from utils.fragment_cache import get_or_render_fragment
+from utils.issues_analytics import (
+    BUCKET_FUNCTIONS, choose_bucket, get_lead_time, get_member_velocity, get_throughput,
+)
+from utils.project_index import get_project_roster
 
 def statistics(request, project_id):
     """
@@ -92,3 +101,88 @@ def statistics_project_user(request, project_id):
     }
 
     return JsonResponse(context)
+
+
+def _get_date_range(request):
+    """
+    解析 GET 参数中的 start（含）和 end（不含），格式 YYYY-MM-DD。
+    :return: (start, end)；参数无效时为 (None, None)。
+    """
+    try:
+        start = datetime.date.fromisoformat(request.GET.get('start', ''))
+        end = datetime.date.fromisoformat(request.GET.get('end', ''))
+    except ValueError:
+        return None, None
+    if start >= end:
+        return None, None
+    return start, end
+
+
+def _get_bucket(request, start, end):
+    """ :return: 分段方式；按月分段仍超过 STATISTICS_MAX_BUCKETS 个时间段时为 None。 """
+    bucket = request.GET.get('bucket')
+    if bucket not in BUCKET_FUNCTIONS:
+        bucket = 'day'
+    return choose_bucket(start, end, bucket, settings.STATISTICS_MAX_BUCKETS)
+
+
+def _cached_json(request, name, compute, vary_on):
+    """
+    统计结果按项目版本缓存：问题新建、修改、导入时版本号加一，缓存随之失效。
+    大范围的统计只在数据变化后的第一次请求时查询数据库。
+    """
+    content = get_or_render_fragment(request, name, lambda: json.dumps(compute()), vary_on=vary_on)
+    return JsonResponse({'status': True, 'data': json.loads(content)})
+
+
+def statistics_throughput(request, project_id):
+    """
+    (AJAX) 按天/周/月统计新建、解决的问题数趋势。
+    参数: start, end, bucket（day | week | month，时间段过多时自动放大）。
+    解决数只包含有状态修改记录的问题，见 utils.issues_analytics._done_records。
+    """
+    start, end = _get_date_range(request)
+    if not start:
+        return JsonResponse({'status': False, 'error': '日期范围无效'})
+    bucket = _get_bucket(request, start, end)
+    if not bucket:
+        return JsonResponse({'status': False, 'error': '日期范围过大'})
+    return _cached_json(
+        request, 'statistics_throughput',
+        lambda: dict(get_throughput(project_id, start, end, bucket), bucket=bucket),
+        vary_on=(start, end, bucket),
+    )
+
+
+def statistics_lead_time(request, project_id):
+    """
+    (AJAX) 时间范围内解决的问题的解决周期：百分位数、平均值和分布。
+    参数: start, end。
+    只包含有状态修改记录的问题，见 utils.issues_analytics._done_records。
+    """
+    start, end = _get_date_range(request)
+    if not start:
+        return JsonResponse({'status': False, 'error': '日期范围无效'})
+    return _cached_json(
+        request, 'statistics_lead_time', lambda: get_lead_time(project_id, start, end), vary_on=(start, end),
+    )
+
+
+def statistics_velocity(request, project_id):
+    """
+    (AJAX) 按指派人统计每个时间段解决的问题数。
+    参数: start, end, bucket。
+    只包含有状态修改记录的问题，见 utils.issues_analytics._done_records。
+    """
+    start, end = _get_date_range(request)
+    if not start:
+        return JsonResponse({'status': False, 'error': '日期范围无效'})
+    bucket = _get_bucket(request, start, end)
+    if not bucket:
+        return JsonResponse({'status': False, 'error': '日期范围过大'})
+    member_list = get_project_roster(request.tracer.project)
+    return _cached_json(
+        request, 'statistics_velocity',
+        lambda: dict(get_member_velocity(project_id, start, end, bucket, member_list), bucket=bucket),
+        vary_on=(start, end, bucket),
+    )
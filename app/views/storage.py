@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse, FileResponse, Http404
+from django.views.decorators.csrf import csrf_exempt
+
+from app import models
+from utils.storage.base import StorageFileNotFound
+from utils.storage.factory import get_storage
+
+@csrf_exempt
+def storage_object(request, bucket, key):
+    """
+    本地/内存存储后端的对象读写接口，模拟COS的 PUT / HEAD / GET 行为，
+    使前端 COS SDK 和文件下载在没有网络的环境下也能工作。
+    - PUT: 写入文件，并在响应头中返回 ETag。
+    - HEAD: 返回文件大小和 ETag。
+    - GET: 流式返回文件内容。
+    只有桶所属项目的创建者和参与者可以访问；PUT 的请求体不能超过当前套餐的单文件大小上限。
+    """
+    if settings.STORAGE_BACKEND == 'cos':
+        raise Http404
+
+    current_user = request.tracer.user
+    if not models.Project.objects.filter(
+        Q(creator=current_user) | Q(projectuser__user=current_user), bucket=bucket
+    ).exists():
+        raise Http404
+
+    storage_client = get_storage()
+    if request.method == 'PUT':
+        content_length = request.META.get('CONTENT_LENGTH') or ''
+        per_file_limit = request.tracer.price_policy.per_file_size * 1024 * 1024
+        if not content_length.isdecimal():
+            return HttpResponse(status=411)
+        if int(content_length) > per_file_limit:
+            return HttpResponse(status=413)
+        storage_client.upload_file(bucket, request, key)
+        metadata = storage_client.check_file(bucket, key)
+        response = HttpResponse()
+        response['ETag'] = metadata['ETag']
+        return response
+
+    try:
+        metadata = storage_client.check_file(bucket, key)
+    except StorageFileNotFound:
+        raise Http404
+
+    if request.method == 'HEAD':
+        response = HttpResponse()
+        response['Content-Length'] = metadata['Content-Length']
+    else:
+        response = FileResponse(storage_client.open_file(bucket, key))
+    response['ETag'] = metadata['ETag']
+    return response
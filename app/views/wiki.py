@@ -1,12 +1,16 @@
+import json
 import uuid
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 
 from app import models
 from app.forms.wiki import WikiModelForm
-from utils.tencent.cos import CosManager
+from utils.fragment_cache import bump_project_version, get_or_render_fragment
+from utils.storage.factory import get_storage
+from utils.thumbnail import is_image, submit_wiki_thumbnail
 
 def wiki(request, project_id):
     """
@@ -36,10 +40,14 @@ def wiki(request, project_id):
 def wiki_catalog(request, project_id):
     """
     获取项目下所有Wiki文章的目录结构（API）。
-    使用.values()可以优化数据库查询，只获取需要的字段。
+    使用.values()可以优化数据库查询，只获取需要的字段；结果按项目版本号缓存，文章增删改后失效。
     """
-    data = models.Wiki.objects.filter(project=request.tracer.project).values('id', 'title', 'parent_id')
-    return JsonResponse({'status': True, 'data': list(data)})
+    def render_catalog():
+        data = models.Wiki.objects.filter(project=request.tracer.project).values('id', 'title', 'parent_id')
+        return json.dumps({'status': True, 'data': list(data)})
+
+    content = get_or_render_fragment(request, 'wiki_catalog', render_catalog)
+    return HttpResponse(content, content_type='application/json')
 
 def wiki_add(request, project_id):
     """
@@ -55,6 +63,7 @@ def wiki_add(request, project_id):
     if form.is_valid():
         form.instance.project = request.tracer.project
         form.save()
+        bump_project_version(project_id)
         url = reverse('wiki', kwargs={'project_id': project_id})
         return redirect(f"{url}?wiki_id={form.instance.id}")
 
@@ -77,6 +86,7 @@ def wiki_edit(request, project_id, wiki_id):
     form = WikiModelForm(request, data=request.POST, instance=wiki_object)
     if form.is_valid():
         form.save()
+        bump_project_version(project_id)
         url = reverse('wiki', kwargs={'project_id': project_id})
         return redirect(f"{url}?wiki_id={wiki_id}")
 
@@ -101,16 +111,17 @@ def wiki_delete(request, project_id, wiki_id):
             queue.extend(children_ids)
 
     models.Wiki.objects.filter(project_id=project_id, id__in=ids_to_delete).delete()
+    bump_project_version(project_id)
     url = reverse('wiki', kwargs={'project_id': project_id})
     return redirect(url)
 
 @csrf_exempt
 def wiki_upload(request, project_id):
     """
-    处理 Editor.md 编辑器中的图片上传。
+    处理 Editor.md 编辑器中的图片上传，上传成功后在后台生成缩略图。
     @csrf_exempt: 标记此视图函数不需要CSRF令牌，因为一些编辑器上传时不携带。
     """
-    result = {'success': 0, 'message': None, 'url': None}
+    result = {'success': 0, 'message': None, 'url': None, 'thumbnail': None}
 
     image_object = request.FILES.get('editormd-image-file')
     if not image_object:
@@ -122,14 +133,17 @@ def wiki_upload(request, project_id):
     random_key = f"wiki/{uuid.uuid4()}.{ext}"
 
     try:
-        cos_client = CosManager(region=project_info.region)
-        image_url = cos_client.upload_file(
+        storage_client = get_storage(region=project_info.region)
+        image_url = storage_client.upload_file(
             bucket=project_info.bucket,
             file_object=image_object,
             key=random_key
         )
         result['success'] = 1
         result['url'] = image_url
+        if is_image(image_object.name) and image_object.size <= settings.THUMBNAIL_MAX_FILE_SIZE:
+            image_object.seek(0)
+            result['thumbnail'] = submit_wiki_thumbnail(project_info, random_key, image_object.read())
     except Exception as e:
         result['message'] = "上传失败，请检查COS配置或联系管理员"
 
@@ -58,17 +58,26 @@ TEMPLATES = [
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates']
         ,
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # 编译后的模板缓存在进程内存中，每个模板只读取和解析一次
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# 进程启动时预编译并校验 app/templates 下的所有模板（生产环境开启），模板有语法错误时启动失败
+TEMPLATE_PRELOAD = not DEBUG
+
 WSGI_APPLICATION = 'django_work.wsgi.application'
 
 
@@ -137,11 +146,89 @@ TENCENT_SMS_APP_TEMPLATE = {
     'login': 548762,
 }
 
+# 存储后端
+# 'cos': 腾讯云COS；'local': 本地磁盘；'memory': 进程内存（仅用于压测和调试）
+STORAGE_BACKEND = 'cos'
+# 本地磁盘存储后端的根目录
+STORAGE_LOCAL_ROOT = os.path.join(BASE_DIR, 'storage')
+
 # COS
 # 腾讯COS的ID
 TENCENT_COS_ID = "aaaa"
 # 腾讯COS的KEY
 TENCENT_COS_KEY = "bbbb"
+# 批量提交文件时，并发核对COS元数据的线程数
+COS_CHECK_MAX_WORKERS = 8
+# 批量复制文件时，并发执行服务端复制的线程数
+COS_COPY_MAX_WORKERS = 8
+
+# 文件库
+# 单次批量提交文件的最大数量
+FILE_POST_BATCH_SIZE = 100
+# 文件库列表每次加载的条数
+FILE_LIST_PER_PAGE = 50
+# 打包下载文件夹时，提前打开的文件数量（预取窗口）
+ZIP_PREFETCH_COUNT = 4
+# 上传空间预留的有效期（秒），与上传临时凭证的有效期一致
+SPACE_RESERVATION_SECONDS = 1800
+# 图片缩略图的最大尺寸（宽, 高）
+THUMBNAIL_SIZE = (200, 200)
+# 后台生成缩略图的线程数
+THUMBNAIL_MAX_WORKERS = 4
+# 生成缩略图的原图最大字节数，更大的文件不生成缩略图（原图需要整个读入内存）
+THUMBNAIL_MAX_FILE_SIZE = 20 * 1024 * 1024
+# 生成缩略图时解码的最大像素数，防止大尺寸的PNG、BMP等以全分辨率解码占满内存
+THUMBNAIL_MAX_PIXELS = 40 * 1000 * 1000
+
+# 页面缓存
+# 用户项目索引（导航栏和项目列表）在Redis中的缓存时间（秒）
+PROJECT_INDEX_CACHE_SECONDS = 60 * 60 * 24
+# 项目页面片段缓存的过期时间（秒），项目版本号变化后旧片段不再被读取
+FRAGMENT_CACHE_SECONDS = 60 * 60
+
+# 问题
+# 批量修改问题时，每条 UPDATE 语句包含的问题数量
+ISSUES_BULK_CHUNK_SIZE = 500
+# 问题操作记录时间线每次加载的条数
+ISSUES_RECORD_PER_PAGE = 50
+# 父问题下拉框异步搜索返回的最大问题数
+ISSUES_PARENT_SEARCH_LIMIT = 20
+# 子问题树（含完成度汇总）在Redis中的缓存时间（秒），树中问题变化时主动失效
+ISSUES_TREE_CACHE_SECONDS = 60 * 60 * 24
+# 导出问题时每次从数据库读取的行数（同时也是每条关注者查询包含的问题数）
+ISSUES_EXPORT_CHUNK_SIZE = 2000
+# 导入问题时每批校验和插入的行数
+ISSUES_IMPORT_CHUNK_SIZE = 1000
+# 导入问题时最多返回的错误行数
+ISSUES_IMPORT_MAX_ERRORS = 100
+# 导入CSV时单元格的最大字符数（csv模块默认只允许128K，迁移过来的长描述会超出）
+ISSUES_IMPORT_MAX_FIELD_SIZE = 16 * 1024 * 1024
+
+# 实时推送
+# 是否开启问题实时推送（Server-Sent Events）。推送连接是长连接，只能以ASGI方式部署（django_work/asgi.py）时开启；
+# WSGI 会把事件流整体读完再返回，每个打开的页面都会一直占用一个工作线程
+REALTIME_ENABLED = False
+# 问题实时推送的事件代理
+# 'redis': Redis发布/订阅（多进程部署）；'local': 进程内存（仅用于测试和单进程调试）
+REALTIME_BROKER = 'redis'
+# 实时推送连接在没有事件时发送心跳的间隔（秒）
+REALTIME_HEARTBEAT_SECONDS = 15
+
+# 通知
+# 通知worker每批从队列中取出的最大事件数
+NOTIFICATION_BATCH_SIZE = 500
+# 同一问题在该时间（秒）内的多次变更，合并到接收者的同一条未读通知中
+NOTIFICATION_COALESCE_SECONDS = 300
+# 合并后的通知内容保留的最近变更行数
+NOTIFICATION_CONTENT_LINES = 10
+# 收件箱每次返回的未读通知数
+NOTIFICATION_INBOX_SIZE = 50
+# 处理失败的事件重新入队的最大次数，超过后移入死信队列 notification_dead_letter
+NOTIFICATION_MAX_ATTEMPTS = 3
+
+# 统计
+# 统计趋势图的最大时间段数，超过时自动改为按周、按月分段
+STATISTICS_MAX_BUCKETS = 120
 
 # redis 配置
 CACHES = {
@@ -0,0 +1,91 @@
+import base
+import timeit
+
+from django.http import QueryDict
+from django.test import RequestFactory
+
+from app import models
+from app.middlewares.auth import Tracer
+from utils.issues_filter import CheckFilter
+from utils.pagination import Pagination
+from utils.project_index import get_project_roster
+
+NUMBER = 5000
+QUERY_STRING = 'status=1&priority=danger&assign=3&attention=5&page=4'
+
+
+def legacy_build_check_choices(request, param_name, choices_data):
+    """ 优化之前的实现：每个选项都修改 QueryDict 并重新 urlencode() 一次。选项的URL同样不带页码。 """
+    query_params = request.GET.copy()
+    current_value = query_params.get(param_name)
+    query_params.pop(param_name, None)
+    query_params.pop('page', None)
+    option_list = [{'text': '全部', 'url': f"?{query_params.urlencode()}", 'active': not current_value}]
+    for key, text in choices_data:
+        query_params[param_name] = key
+        option_list.append({'text': text, 'url': f"?{query_params.urlencode()}", 'active': str(key) == current_value})
+    return option_list
+
+
+def legacy_page_urls(query_params, page_count):
+    """ 优化之前 Pagination._build_url 的开销：每个页码都修改 QueryDict 并重新 urlencode() 一次。 """
+    query_params = query_params.copy()
+    url_list = []
+    for page in range(1, page_count + 1):
+        query_params['page'] = page
+        url_list.append(f"/manage/1/issues/?{query_params.urlencode()}")
+    return url_list
+
+
+def legacy_project_members(project):
+    """ 优化之前的成员查询：读取创建者对象 + 查询参与者。 """
+    project = models.Project.objects.get(id=project.id)
+    members = [(project.creator.id, project.creator.username)]
+    members.extend(models.ProjectUser.objects.filter(project=project).values_list('user_id', 'user__username'))
+    return members
+
+
+def report(title, func, number=NUMBER):
+    seconds = timeit.timeit(func, number=number)
+    print(f"{title}: {seconds / number * 1000000:.2f} 微秒/次")
+
+
+def run():
+    """
+    utils/issues_filter.py 和 utils/pagination.py 的微基准测试。
+    成员名单部分需要数据库中至少有一个项目，并且Redis可用时才能体现缓存效果。
+    """
+    request = RequestFactory().get(f'/manage/1/issues/?{QUERY_STRING}')
+    filter_handler = CheckFilter(['status', 'priority', 'assign', 'attention'], request)
+    query_params = QueryDict(QUERY_STRING)
+
+    for param_name, choices in [('status', models.Issues.status_choices), ('priority', models.Issues.priority_choices)]:
+        assert legacy_build_check_choices(request, param_name, choices) == \
+               filter_handler._build_check_choices(param_name, choices)
+        report(f"{param_name} 筛选URL（逐个 urlencode）",
+               lambda: legacy_build_check_choices(request, param_name, choices))
+        report(f"{param_name} 筛选URL（拼接基础查询字符串）",
+               lambda: filter_handler._build_check_choices(param_name, choices))
+
+    pagination = Pagination(current_page=4, all_count=3000, base_url='/manage/1/issues/', query_params=query_params)
+    report("11个页码URL（逐个 urlencode）", lambda: legacy_page_urls(query_params, 11))
+    report("11个页码URL（拼接页码）", lambda: [pagination._build_url(page) for page in range(1, 12)])
+    report("完整分页HTML（拼接页码）", pagination.page_html)
+    report("Pagination 初始化 + 分页HTML", lambda: Pagination(
+        current_page=4, all_count=3000, base_url='/manage/1/issues/', query_params=query_params
+    ).page_html())
+
+    project = models.Project.objects.order_by('id').first()
+    if not project:
+        print("数据库中没有项目，跳过成员名单测试")
+        return
+    request.tracer = Tracer()
+    request.tracer.project = project
+    get_project_roster(project)
+    report("项目成员（每次查询数据库）", lambda: legacy_project_members(project), number=500)
+    report("项目成员（缓存的成员名单）", lambda: get_project_roster(project), number=500)
+    report("完整筛选选项 get_filter_choices", filter_handler.get_filter_choices, number=500)
+
+
+if __name__ == '__main__':
+    run()
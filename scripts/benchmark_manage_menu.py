@@ -0,0 +1,51 @@
+import base
+import timeit
+
+from django.template import Context, Template
+from django.test import RequestFactory
+from django.urls import reverse
+
+from app.middlewares.auth import Tracer
+from app.templatetags.project import MANAGE_MENU_LIST, manage_menu_list
+
+NUMBER = 20000
+
+
+def legacy_manage_menu_list(request):
+    """ 预编译之前的实现：每次渲染都重建字典并调用6次 reverse()。 """
+    data_list = [{'title': title, 'url_name': url_name} for title, url_name in MANAGE_MENU_LIST]
+    for item in data_list:
+        item['url'] = reverse(item['url_name'], kwargs={'project_id': request.tracer.project.id})
+        if request.path_info.startswith(item['url']):
+            item['class'] = 'active'
+    return {'data_list': data_list}
+
+
+class FakeProject:
+    id = 1
+
+
+def run():
+    """
+    对比侧边栏菜单每次渲染的耗时：旧实现、预编译实现，以及包含模板渲染的完整 inclusion tag。
+    """
+    request = RequestFactory().get('/manage/1/issues/detail/3/')
+    request.tracer = Tracer()
+    request.tracer.project = FakeProject()
+    template = Template('{% load project %}{% manage_menu_list request %}')
+    context = Context({'request': request})
+
+    simplify = lambda result: [(item['title'], item['url'], item.get('class')) for item in result['data_list']]
+    assert simplify(legacy_manage_menu_list(request)) == simplify(manage_menu_list(request))
+    cases = [
+        ('reverse() 每次渲染', lambda: legacy_manage_menu_list(request)),
+        ('预编译菜单', lambda: manage_menu_list(request)),
+        ('完整渲染 inclusion tag', lambda: template.render(context)),
+    ]
+    for title, func in cases:
+        seconds = timeit.timeit(func, number=NUMBER)
+        print(f"{title}: {seconds / NUMBER * 1000000:.2f} 微秒/次")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,51 @@
+import base
+import time
+
+from django.template import engines
+
+from utils.template_preload import get_template_names, preload_templates
+
+
+def reset_template_cache():
+    for loader in engines['django'].engine.template_loaders:
+        if hasattr(loader, 'reset'):
+            loader.reset()
+
+
+def load_all(name_list):
+    """ 依次获取所有模板，返回 {模板名: 耗时(毫秒)}。 """
+    engine = engines['django']
+    cost_dict = {}
+    for name in name_list:
+        start = time.perf_counter()
+        engine.get_template(name)
+        cost_dict[name] = (time.perf_counter() - start) * 1000
+    return cost_dict
+
+
+def run():
+    """
+    对比首个请求获取模板的耗时：
+    - 未预编译：缓存为空，请求中第一次用到模板时才读取文件并解析（首个请求承担的开销）。
+    - 已预编译：启动时 preload_templates 已完成解析，请求中只是一次内存查找。
+    """
+    name_list = get_template_names()
+
+    reset_template_cache()
+    cold_dict = load_all(name_list)
+
+    reset_template_cache()
+    start = time.perf_counter()
+    count = preload_templates()
+    preload_cost = (time.perf_counter() - start) * 1000
+    warm_dict = load_all(name_list)
+
+    print(f"启动时预编译 {count} 个模板耗时: {preload_cost:.2f} 毫秒")
+    print(f"{'模板':<45}{'未预编译(毫秒)':>16}{'已预编译(毫秒)':>16}")
+    for name in sorted(name_list, key=lambda item: -cold_dict[item]):
+        print(f"{name:<45}{cold_dict[name]:>16.3f}{warm_dict[name]:>16.3f}")
+    print(f"{'合计':<45}{sum(cold_dict.values()):>16.3f}{sum(warm_dict.values()):>16.3f}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,41 @@
+import base
+import argparse
+import csv
+
+from django.conf import settings
+
+from app import models
+from utils.issues_import import IssuesImporter, iter_import_rows
+
+
+def run(project_id, path, user_id=None, file_format=None):
+    """
+    从 CSV 或 JSON/NDJSON 文件批量导入问题，创建者默认为项目创建者。
+    """
+    project = models.Project.objects.get(id=project_id)
+    creator = models.UserInfo.objects.get(id=user_id) if user_id else project.creator
+    file_format = file_format or ('json' if path.lower().endswith(('.json', '.ndjson', '.jsonl')) else 'csv')
+
+    importer = IssuesImporter(
+        project, creator, chunk_size=settings.ISSUES_IMPORT_CHUNK_SIZE, max_errors=settings.ISSUES_IMPORT_MAX_ERRORS
+    )
+    with open(path, 'rb') as file_object:
+        try:
+            created = importer.run(iter_import_rows(file_object, file_format))
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            print(f"文件格式错误: {e}")
+            return
+
+    for item in importer.error_list:
+        print(f"  第 {item['row']} 行: {item['errors']}")
+    print(f"项目 {project.id}: 创建问题 {created} 个，跳过错误行 {importer.error_count} 行")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='从 CSV 或 JSON/NDJSON 文件批量导入问题。')
+    parser.add_argument('--project', type=int, required=True, help='导入到的项目ID')
+    parser.add_argument('--file', required=True, help='导入文件路径')
+    parser.add_argument('--user', type=int, help='问题的创建者ID，默认为项目创建者')
+    parser.add_argument('--format', choices=['csv', 'json'], help='文件格式，默认按扩展名判断')
+    args = parser.parse_args()
+    run(args.project, args.file, user_id=args.user, file_format=args.format)
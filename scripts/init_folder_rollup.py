@@ -0,0 +1,32 @@
+import base
+from collections import defaultdict
+from app import models
+
+def run():
+    """
+    根据文件记录重新计算所有文件夹的 total_size 和 file_count。
+    用于为已有数据初始化汇总字段，或修复汇总数据的偏差。
+    """
+    for project_id in models.Project.objects.values_list('id', flat=True):
+        rows = list(models.FileRepository.objects.filter(project_id=project_id).values_list(
+            'id', 'parent_id', 'file_type', 'file_size'
+        ))
+        parent_dict = {row_id: parent_id for row_id, parent_id, _, _ in rows}
+        size_dict = defaultdict(int)
+        count_dict = defaultdict(int)
+        for _, parent_id, file_type, file_size in rows:
+            if file_type != 1:
+                continue
+            while parent_id:
+                size_dict[parent_id] += file_size or 0
+                count_dict[parent_id] += 1
+                parent_id = parent_dict.get(parent_id)
+
+        folder_list = [
+            models.FileRepository(id=row_id, total_size=size_dict[row_id], file_count=count_dict[row_id])
+            for row_id, _, file_type, _ in rows if file_type == 2
+        ]
+        models.FileRepository.objects.bulk_update(folder_list, ['total_size', 'file_count'], batch_size=500)
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,40 @@
+import base
+import argparse
+import time
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from utils.notification import pop_events, process_events, requeue_events
+
+
+def run(once=False):
+    """
+    持续从Redis队列中按批取出问题变更事件，分发到指派人和关注者的收件箱。
+    once 为 True 时，队列为空后立即退出（用于定时任务）。
+    处理失败的事件重新入队，多次失败后移入死信队列，不会丢失。
+    """
+    conn = get_redis_connection()
+    while True:
+        event_list = pop_events(conn, settings.NOTIFICATION_BATCH_SIZE, timeout=1 if once else 5)
+        if not event_list:
+            if once:
+                break
+            continue
+        try:
+            created, merged = process_events(event_list)
+            print(f"处理 {len(event_list)} 个事件：新建通知 {created} 条，合并 {merged} 条")
+        except Exception as e:
+            requeued, dead = requeue_events(conn, event_list)
+            print(f"处理 {len(event_list)} 个事件失败: {e}，重新入队 {requeued} 个，移入死信队列 {dead} 个")
+            if once:
+                break
+            # 数据库等依赖暂时不可用时，稍等再重试，避免空转
+            time.sleep(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='分发问题变更通知。')
+    parser.add_argument('--once', action='store_true', help='处理完队列中的事件后退出')
+    args = parser.parse_args()
+    run(once=args.once)
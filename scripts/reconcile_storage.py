@@ -0,0 +1,115 @@
+import base
+import argparse
+import datetime
+import re
+
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from app import models
+from utils.bloom_filter import BloomFilter
+from utils.storage.factory import get_storage
+from utils.thumbnail import get_thumbnail_key
+
+# wiki图片的key为 wiki/<uuid>.<扩展名>，缩略图为 thumbnail/wiki/<uuid>.<扩展名>.jpg，都按 wiki/<uuid> 匹配引用
+WIKI_KEY_PATTERN = re.compile(r'wiki/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+DELETE_BATCH_SIZE = 1000
+
+
+def build_reference_filter(project):
+    """
+    把项目中所有被引用的key放入布隆过滤器：文件库的文件及其缩略图、wiki正文中引用的图片。
+    数据库记录通过 iterator() 流式读取，内存占用与记录数无关（只取决于过滤器大小）。
+    """
+    file_queryset = models.FileRepository.objects.filter(project=project, file_type=1)
+    wiki_queryset = models.Wiki.objects.filter(project=project)
+    bloom = BloomFilter(capacity=file_queryset.count() * 2 + wiki_queryset.count() * 20 + 1000)
+
+    for key in file_queryset.values_list('key', flat=True).iterator(chunk_size=2000):
+        bloom.add(key)
+        bloom.add(get_thumbnail_key(key))
+
+    for content in wiki_queryset.values_list('content', flat=True).iterator(chunk_size=200):
+        for wiki_key in WIKI_KEY_PATTERN.findall(content):
+            bloom.add(wiki_key)
+    return bloom
+
+
+def is_referenced(bloom, key):
+    """ wiki图片及其缩略图按 wiki/<uuid> 判断，其余对象按完整key判断。 """
+    match = WIKI_KEY_PATTERN.match(key[len('thumbnail/'):] if key.startswith('thumbnail/') else key)
+    return (match.group(0) if match else key) in bloom
+
+
+def fix_use_space(project):
+    """ 用文件库中文件大小的总和修正 use_space，单条 UPDATE 完成，不会覆盖并发写入。 """
+    file_size_sum = models.FileRepository.objects.filter(
+        project=OuterRef('pk'), file_type=1
+    ).values('project').annotate(total=Sum('file_size')).values('total')
+    models.Project.objects.filter(id=project.id).update(use_space=Coalesce(Subquery(file_size_sum), Value(0)))
+
+
+def reconcile_project(project, purge=False, fix_space=False, grace_hours=24):
+    """
+    对一个项目的存储桶做对账：
+    - 分页遍历存储桶，用布隆过滤器判断每个对象是否被引用，未被引用的即为孤儿对象。
+      布隆过滤器只会把孤儿误判为“被引用”（漏删），不会误删被引用的对象。
+    - 最近 grace_hours 小时内修改的对象可能是正在上传、尚未提交记录的文件，不作处理。
+    - purge 为 True 时按批删除孤儿对象；fix_space 为 True 时修正 use_space 的偏差。
+    """
+    storage_client = get_storage(region=project.region)
+    bloom = build_reference_filter(project)
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=grace_hours)
+
+    object_count = orphan_count = orphan_size = 0
+    delete_list = []
+    for item in storage_client.list_files(project.bucket):
+        object_count += 1
+        if is_referenced(bloom, item['Key']):
+            continue
+        if item['LastModified'] and item['LastModified'] > cutoff:
+            continue
+
+        orphan_count += 1
+        orphan_size += item['Size']
+        print(f"  孤儿对象: {item['Key']} ({item['Size']} 字节)")
+        if purge:
+            delete_list.append({'Key': item['Key']})
+            if len(delete_list) >= DELETE_BATCH_SIZE:
+                storage_client.delete_file_list(project.bucket, delete_list)
+                delete_list = []
+    if delete_list:
+        storage_client.delete_file_list(project.bucket, delete_list)
+
+    file_size_sum = models.FileRepository.objects.filter(
+        project=project, file_type=1
+    ).aggregate(total=Sum('file_size'))['total'] or 0
+    drift = project.use_space - file_size_sum
+    if fix_space and drift:
+        fix_use_space(project)
+
+    print(f"项目 {project.id}({project.bucket}): 对象 {object_count} 个，孤儿 {orphan_count} 个共 {orphan_size} 字节"
+          f"{'（已删除）' if purge and orphan_count else ''}，use_space 偏差 {drift} 字节"
+          f"{'（已修正）' if fix_space and drift else ''}")
+    return orphan_count, orphan_size, drift
+
+
+def run(project_id=None, purge=False, fix_space=False, grace_hours=24):
+    queryset = models.Project.objects.all().order_by('id')
+    if project_id:
+        queryset = queryset.filter(id=project_id)
+    for project in queryset.iterator():
+        try:
+            reconcile_project(project, purge=purge, fix_space=fix_space, grace_hours=grace_hours)
+        except Exception as e:
+            print(f"项目 {project.id}({project.bucket}) 对账失败: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='对账存储桶中的对象与数据库记录，报告或清理孤儿对象。')
+    parser.add_argument('--project', type=int, help='只处理指定ID的项目')
+    parser.add_argument('--purge', action='store_true', help='删除孤儿对象（默认只报告）')
+    parser.add_argument('--fix-space', action='store_true', help='按文件库记录修正项目已使用空间')
+    parser.add_argument('--grace-hours', type=int, default=24, help='跳过最近N小时内修改的对象，默认24')
+    args = parser.parse_args()
+    run(project_id=args.project, purge=args.purge, fix_space=args.fix_space, grace_hours=args.grace_hours)
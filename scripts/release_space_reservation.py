@@ -0,0 +1,9 @@
+import base
+from utils.quota import release_expired_reservations
+
+def run():
+    count = release_expired_reservations()
+    print(f"已回收 {count} 条过期的空间预留")
+
+if __name__ == '__main__':
+    run()
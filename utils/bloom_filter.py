@@ -0,0 +1,41 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    布隆过滤器，用固定大小的位数组判断一个字符串“可能存在”或“一定不存在”。
+
+    - 内存占用只和预计元素数量、误判率有关，与字符串长度无关，百万级key只需几MB。
+    - 只会把不存在的元素误判为存在，不会漏判已存在的元素。
+
+    使用示例:
+        bloom = BloomFilter(capacity=100000)
+        bloom.add('file1.jpg')
+        'file1.jpg' in bloom   # True
+        'file2.jpg' in bloom   # 大概率为 False
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        :param capacity: 预计加入的元素数量，超出后误判率会升高。
+        :param error_rate: 期望的误判率。
+        """
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        """双重哈希：由一次 blake2b 摘要的两个64位整数生成 hash_count 个位置。"""
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
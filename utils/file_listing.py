@@ -0,0 +1,145 @@
+import base64
+import datetime
+import json
+
+from django.db.models import F, Q
+
+from app import models
+
+
+class FileListPager:
+    """
+    文件库列表的排序与游标（keyset）分页组件。
+
+    - 文件夹始终排在文件前面，文件夹和文件分别按排序字段 + id 分页；
+      按名称、大小、日期排序时能命中 (project, parent, file_type, 排序字段, id) 复合索引。
+      按更新者排序需要关联用户表的用户名，没有对应的索引，由数据库在当前目录的记录中排序。
+    - 游标记录上一页最后一行的 (file_type, 排序值, id)，翻页代价与页码无关。
+      游标的排序值类型与当前排序方式不符（被篡改或来自其他排序）时从第一页开始。
+
+    在视图函数中使用示例:
+        pager = FileListPager(project_id, parent_id, sort=request.GET.get('sort'),
+                              order=request.GET.get('order'), cursor=request.GET.get('cursor'))
+        object_list, next_cursor = pager.get_page()
+    """
+    # 排序键 -> (文件使用的字段, 文件夹使用的字段)
+    SORT_FIELDS = {
+        'name': ('name', 'name'),
+        'size': ('file_size', 'total_size'),
+        'date': ('update_datetime', 'update_datetime'),
+        'updater': ('update_user__username', 'update_user__username'),
+    }
+    # 排序键 -> 游标中排序值的类型
+    CURSOR_TYPES = {
+        'name': str,
+        'size': int,
+        'date': str,
+        'updater': str,
+    }
+    # 可能为空的排序字段：空值在升序时排最前、降序时排最后
+    NULLABLE_FIELDS = {'file_size'}
+
+    def __init__(self, project_id, parent_id, sort=None, order=None, cursor=None, per_page=50):
+        """
+        :param project_id: 项目ID。
+        :param parent_id: 父文件夹ID，为 None 时表示根目录。
+        :param sort: 排序键，取值见 SORT_FIELDS，非法值按名称排序。
+        :param order: 'asc' 或 'desc'，非法值按升序。
+        :param cursor: 上一页返回的游标，为空时返回第一页。
+        :param per_page: 每页条数。
+        """
+        self.project_id = project_id
+        self.parent_id = parent_id
+        self.sort = sort if sort in self.SORT_FIELDS else 'name'
+        self.order = order if order in ('asc', 'desc') else 'asc'
+        self.per_page = per_page
+        self.cursor = self.decode_cursor(cursor)
+
+    def _get_field(self, file_type):
+        file_field, folder_field = self.SORT_FIELDS[self.sort]
+        return folder_field if file_type == 2 else file_field
+
+    def _get_queryset(self, file_type, after=None):
+        """
+        获取某一类型（文件夹/文件）的有序查询集。
+        :param after: (排序值, id)，只返回排在其后的记录。
+        """
+        field = self._get_field(file_type)
+        queryset = models.FileRepository.objects.filter(
+            project_id=self.project_id, parent_id=self.parent_id, file_type=file_type
+        ).select_related('update_user')
+
+        if after:
+            value, last_id = after
+            lookup = 'gt' if self.order == 'asc' else 'lt'
+            if value is None:
+                condition = Q(**{f'{field}__isnull': True, f'id__{lookup}': last_id})
+                if self.order == 'asc':
+                    condition |= Q(**{f'{field}__isnull': False})
+            else:
+                condition = Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'id__{lookup}': last_id})
+                if self.order == 'desc' and field in self.NULLABLE_FIELDS:
+                    condition |= Q(**{f'{field}__isnull': True})
+            queryset = queryset.filter(condition)
+
+        if self.order == 'asc':
+            return queryset.order_by(F(field).asc(nulls_first=True), 'id')
+        return queryset.order_by(F(field).desc(nulls_last=True), '-id')
+
+    def get_page(self):
+        """
+        :return: (当前页的 FileRepository 对象列表, 下一页游标；没有下一页时为 None)
+        """
+        object_list = []
+        for file_type in (2, 1):
+            after = None
+            if self.cursor:
+                cursor_type, value, last_id = self.cursor
+                if file_type > cursor_type:
+                    continue
+                if file_type == cursor_type:
+                    after = (value, last_id)
+
+            remain = self.per_page + 1 - len(object_list)
+            object_list.extend(self._get_queryset(file_type, after)[:remain])
+            if len(object_list) > self.per_page:
+                break
+
+        if len(object_list) <= self.per_page:
+            return object_list, None
+
+        object_list = object_list[:self.per_page]
+        return object_list, self.encode_cursor(object_list[-1])
+
+    def _get_value(self, instance):
+        if self.sort == 'updater':
+            return instance.update_user.username
+        return getattr(instance, self._get_field(instance.file_type))
+
+    def encode_cursor(self, instance):
+        value = self._get_value(instance)
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        data = json.dumps([instance.file_type, value, instance.id])
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('utf-8')
+
+    def decode_cursor(self, cursor):
+        """解析游标，非法游标视为从第一页开始。"""
+        if not cursor:
+            return None
+        try:
+            file_type, value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+        except (ValueError, TypeError):
+            return None
+        if file_type not in (1, 2) or type(last_id) is not int:
+            return None
+        # 只有可能为空的字段（文件大小）允许空值；bool 是 int 的子类，需要用 type() 精确比较
+        nullable = self.sort == 'size' and file_type == 1
+        if not (value is None and nullable) and type(value) is not self.CURSOR_TYPES[self.sort]:
+            return None
+        if self.sort == 'date':
+            try:
+                value = datetime.datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        return file_type, value, last_id
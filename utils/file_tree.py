@@ -0,0 +1,54 @@
+from django.db.models import F
+
+from app import models
+
+
+def get_ancestor_ids(folder_id):
+    """
+    获取文件夹自身及其所有祖先文件夹的ID（由近及远）。
+
+    :param folder_id: 文件夹ID，为 None 时表示根目录，返回空列表。
+    """
+    ancestor_ids = []
+    while folder_id:
+        ancestor_ids.append(folder_id)
+        folder_id = models.FileRepository.objects.filter(id=folder_id).values_list('parent_id', flat=True).first()
+    return ancestor_ids
+
+
+def update_folder_rollup(folder_id, size, count, ancestor_ids=None):
+    """
+    将文件大小和文件数量的增量累加到文件夹及其所有祖先文件夹上。
+    整条祖先链通过一条 F() UPDATE 完成，调用方应在同一个事务中写入文件记录。
+
+    :param folder_id: 发生变化的文件所在的文件夹ID，为 None 时表示根目录，无需更新。
+    :param size: 文件大小的增量（字节），删除时为负数。
+    :param count: 文件数量的增量，删除时为负数。
+    :param ancestor_ids: 已经查询好的祖先链（get_ancestor_ids 的结果），移动节点时需传入移动前的祖先链。
+    """
+    if ancestor_ids is None:
+        ancestor_ids = get_ancestor_ids(folder_id)
+    if not ancestor_ids or not (size or count):
+        return
+    models.FileRepository.objects.filter(id__in=ancestor_ids).update(
+        total_size=F('total_size') + size,
+        file_count=F('file_count') + count
+    )
+
+
+def walk_subtree(project_id, folder_id):
+    """
+    广度优先遍历文件夹下的所有子孙节点，每一层只需一次查询。
+
+    :param project_id: 项目ID。
+    :param folder_id: 起始文件夹ID（不包含其自身），也可以是多个文件夹ID组成的列表。
+    :return: 生成器，逐个返回子孙 FileRepository 对象（父节点总是先于子节点返回）。
+    """
+    level_ids = list(folder_id) if isinstance(folder_id, (list, tuple, set)) else [folder_id]
+    while level_ids:
+        children = models.FileRepository.objects.filter(project_id=project_id, parent_id__in=level_ids)
+        level_ids = []
+        for child in children.iterator(chunk_size=2000):
+            if child.file_type == 2:
+                level_ids.append(child.id)
+            yield child
@@ -0,0 +1,77 @@
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+
+
+def _get_version_key(project_id):
+    return f'project_version_{project_id}'
+
+
+def get_project_version(request):
+    """
+    获取当前项目的版本号，同一个请求内只读取一次Redis。
+    项目中与页面片段相关的数据发生变化时，版本号由 bump_project_version 加一，旧片段随之失效。
+    """
+    version = getattr(request, '_project_version', None)
+    if version is None:
+        version = int(get_redis_connection().get(_get_version_key(request.tracer.project.id)) or 0)
+        request._project_version = version
+    return version
+
+
+def bump_project_version(project_id):
+    """
+    项目版本号加一，使该项目的所有缓存片段失效。
+    在事务中调用时，等事务提交后再加一，避免并发请求用未提交前的旧数据生成新版本的片段。
+    """
+    def incr():
+        try:
+            get_redis_connection().incr(_get_version_key(project_id))
+        except Exception:
+            pass
+
+    transaction.on_commit(incr)
+
+
+def get_user_role(request):
+    """ 片段按用户在项目中的角色区分缓存：创建者或参与者看到的内容可以不同。 """
+    return 'creator' if request.tracer.project.creator_id == request.tracer.user.id else 'member'
+
+
+def get_fragment_key(request, fragment_name, vary_on=()):
+    """
+    生成片段缓存的key: fragment_<项目ID>_<版本号>_<角色>_<片段名>_<vary_on摘要>。
+    版本号变化后旧key不再被访问，由过期时间自动清理。
+    """
+    vary_digest = hashlib.md5('|'.join(str(item) for item in vary_on).encode('utf-8')).hexdigest()
+    return (f'fragment_{request.tracer.project.id}_{get_project_version(request)}_'
+            f'{get_user_role(request)}_{fragment_name}_{vary_digest}')
+
+
+def get_or_render_fragment(request, fragment_name, render, vary_on=()):
+    """
+    读取缓存的片段，未命中时调用 render() 生成并写入Redis。
+    Redis不可用时直接返回 render() 的结果，不影响页面渲染。
+
+    :param request: 当前请求，需要 request.tracer.project 和 request.tracer.user。
+    :param fragment_name: 片段名称，同一项目中唯一。
+    :param render: 无参函数，返回片段内容（字符串）。
+    :param vary_on: 影响片段内容的其他值，例如筛选条件。
+    """
+    try:
+        fragment_key = get_fragment_key(request, fragment_name, vary_on)
+        conn = get_redis_connection()
+        content = conn.get(fragment_key)
+        if content is not None:
+            return content.decode('utf-8')
+    except Exception:
+        return render()
+
+    content = render()
+    try:
+        conn.set(fragment_key, content, ex=settings.FRAGMENT_CACHE_SECONDS)
+    except Exception:
+        pass
+    return content
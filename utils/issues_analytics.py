@@ -0,0 +1,236 @@
+import bisect
+import datetime
+from collections import defaultdict
+
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Min
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from app import models
+from utils.issues_tree import DONE_STATUS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BUCKET_FUNCTIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+# 按天、按周分段时每个时间段的天数
+BUCKET_DAYS = {'day': 1, 'week': 7}
+
+# 状态变为已解决/已关闭时生成的修改记录内容，与 _apply_choice_field 的格式一致
+_status_field = models.Issues._meta.get_field('status')
+DONE_CONTENTS = [
+    f"{_status_field.verbose_name} 更新为 {text}" for key, text in models.Issues.status_choices if key in DONE_STATUS
+]
+
+LEAD_TIME_PERCENTILES = [50, 75, 90, 95]
+# 解决周期分布的分段（天）
+LEAD_TIME_BINS = [1, 3, 7, 14, 30]
+
+
+def _bucket_start(day, bucket):
+    if bucket == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(day, bucket):
+    if bucket == 'week':
+        return day + datetime.timedelta(days=7)
+    if bucket == 'month':
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return day + datetime.timedelta(days=1)
+
+
+def iter_buckets(start, end, bucket):
+    """
+    生成 [start, end) 范围内每个时间段的起始日期，没有数据的时间段也包含在内。
+    按周、按月分段时第一个时间段的起始日期可能早于 start，与数据库 Trunc 的分组结果一致。
+    """
+    day = _bucket_start(start, bucket)
+    while day < end:
+        yield day
+        try:
+            day = _next_bucket(day, bucket)
+        except OverflowError:
+            # 已是 date.max 所在的时间段
+            return
+
+
+def _bucket_label(day, start):
+    """ 时间段在图表中的标签。第一个时间段早于 start 时用 start，标签不超出查询的日期范围。 """
+    return max(day, start).isoformat()
+
+
+def count_buckets(start, end, bucket):
+    """ [start, end) 范围按 bucket 分段后的时间段数，不逐个生成时间段。 """
+    last_day = end - datetime.timedelta(days=1)
+    if bucket == 'month':
+        return (last_day.year - start.year) * 12 + last_day.month - start.month + 1
+    return (_bucket_start(last_day, bucket) - _bucket_start(start, bucket)).days // BUCKET_DAYS[bucket] + 1
+
+
+def choose_bucket(start, end, bucket, max_buckets):
+    """
+    时间段数超过 max_buckets 时依次改用按周、按月分段，避免图表点数随日期范围无限增长。
+    :return: 分段方式；按月分段仍超过 max_buckets 时返回 None。
+    """
+    bucket_list = list(BUCKET_FUNCTIONS)
+    for candidate in bucket_list[bucket_list.index(bucket):]:
+        if count_buckets(start, end, candidate) <= max_buckets:
+            return candidate
+    return None
+
+
+def _done_records(project_id, start, end):
+    """
+    时间范围内状态变为已解决/已关闭的修改记录。
+    问题没有单独记录解决时间，这里按修改记录的内容（DONE_CONTENTS）匹配，因此：
+    - 创建或导入时状态已是已解决/已关闭的问题没有这类记录，不计入统计；
+    - 修改状态的显示名称后，之前生成的记录不再匹配。
+    """
+    return models.IssuesReply.objects.filter(
+        issues__project_id=project_id,
+        reply_type=1,
+        content__in=DONE_CONTENTS,
+        create_datetime__gte=start,
+        create_datetime__lt=end,
+    )
+
+
+def _count_by_bucket(queryset, field, bucket, count_expression):
+    """ 在数据库中按时间段分组计数，返回 {时间段起始日期: 数量}。 """
+    result = queryset.annotate(
+        bucket=BUCKET_FUNCTIONS[bucket](field)
+    ).values('bucket').annotate(ct=count_expression).order_by()
+    return {item['bucket'].date(): item['ct'] for item in result}
+
+
+def get_throughput(project_id, start, end, bucket):
+    """
+    按时间段统计新建和解决的问题数，以及期末未解决问题数的变化。
+    分组计数在数据库中完成（Trunc + GROUP BY），每个时间段只返回一行，与问题数量无关。
+    同一问题在一个时间段内多次解决只计一次。
+
+    :param start: 开始日期（含）。
+    :param end: 结束日期（不含）。
+    :param bucket: 'day' | 'week' | 'month'
+    :return: {'categories': [时间段], 'series': [{'name', 'data'}, ...]}
+    """
+    created_dict = _count_by_bucket(
+        models.Issues.objects.filter(project_id=project_id, create_datetime__gte=start, create_datetime__lt=end),
+        'create_datetime', bucket, Count('id'),
+    )
+    resolved_dict = _count_by_bucket(
+        _done_records(project_id, start, end), 'create_datetime', bucket, Count('issues_id', distinct=True),
+    )
+
+    categories = []
+    created_list = []
+    resolved_list = []
+    net_list = []
+    net = 0
+    for day in iter_buckets(start, end, bucket):
+        categories.append(_bucket_label(day, start))
+        created_list.append(created_dict.get(day, 0))
+        resolved_list.append(resolved_dict.get(day, 0))
+        net += created_list[-1] - resolved_list[-1]
+        net_list.append(net)
+    return {
+        'categories': categories,
+        'series': [
+            {'name': '新建', 'data': created_list},
+            {'name': '解决', 'data': resolved_list},
+            {'name': '累计净增', 'data': net_list},
+        ]
+    }
+
+
+def _percentiles(value_list, percent_list):
+    """ 计算百分位数（线性插值，与 numpy.percentile 的默认方式一致）。value_list 需已排序。 """
+    if numpy is not None:
+        return [float(value) for value in numpy.percentile(value_list, percent_list)]
+    result = []
+    last_index = len(value_list) - 1
+    for percent in percent_list:
+        position = last_index * percent / 100
+        lower = int(position)
+        upper = min(lower + 1, last_index)
+        result.append(value_list[lower] + (value_list[upper] - value_list[lower]) * (position - lower))
+    return result
+
+
+def get_lead_time(project_id, start, end):
+    """
+    统计时间范围内解决的问题的解决周期（从创建到第一次变为已解决/已关闭）。
+    每个问题第一次解决的时间和周期由数据库按问题分组计算（MIN + 日期相减），只取回周期秒数；
+    百分位数在安装了 NumPy 时用 numpy.percentile 计算，否则用排序后线性插值。
+
+    :return: {'count', 'mean', 'max', 'percentiles': {百分位: 天数}, 'distribution': [{'name', 'y'}, ...]}
+             天数保留一位小数。
+    """
+    # 先用时间范围内的解决记录缩小问题范围，再对这些问题的全部解决记录取最早一条
+    resolved_ids = _done_records(project_id, start, end).values('issues_id')
+    first_done = models.IssuesReply.objects.filter(
+        issues_id__in=resolved_ids, reply_type=1, content__in=DONE_CONTENTS,
+    ).values('issues_id', 'issues__create_datetime').annotate(
+        done_datetime=Min('create_datetime'),
+        lead_time=ExpressionWrapper(Min('create_datetime') - F('issues__create_datetime'), output_field=DurationField()),
+    ).filter(done_datetime__gte=start, done_datetime__lt=end).order_by()
+
+    day_list = sorted(item['lead_time'].total_seconds() / 86400 for item in first_done)
+    bin_labels = [f'{low}-{high}天' for low, high in zip([0] + LEAD_TIME_BINS, LEAD_TIME_BINS)]
+    bin_labels.append(f'{LEAD_TIME_BINS[-1]}天以上')
+    bin_counts = [0] * len(bin_labels)
+    for days in day_list:
+        bin_counts[bisect.bisect_right(LEAD_TIME_BINS, days)] += 1
+
+    result = {
+        'count': len(day_list),
+        'mean': None,
+        'max': None,
+        'percentiles': {percent: None for percent in LEAD_TIME_PERCENTILES},
+        'distribution': [{'name': label, 'y': count} for label, count in zip(bin_labels, bin_counts)],
+    }
+    if day_list:
+        result['mean'] = round(sum(day_list) / len(day_list), 1)
+        result['max'] = round(day_list[-1], 1)
+        result['percentiles'] = {
+            percent: round(value, 1)
+            for percent, value in zip(LEAD_TIME_PERCENTILES, _percentiles(day_list, LEAD_TIME_PERCENTILES))
+        }
+    return result
+
+
+def get_member_velocity(project_id, start, end, bucket, member_list):
+    """
+    按指派人统计每个时间段解决的问题数。按 (指派人, 时间段) 在数据库中分组计数。
+
+    :param member_list: 项目成员 [(用户ID, 用户名), ...]，决定图表中成员的顺序。
+    :return: {'categories': [时间段], 'series': [{'name': 成员, 'data': [...]}, ...]}，没有解决问题的成员不返回。
+    """
+    result = _done_records(project_id, start, end).annotate(
+        bucket=BUCKET_FUNCTIONS[bucket]('create_datetime')
+    ).values('issues__assign_id', 'bucket').annotate(ct=Count('issues_id', distinct=True)).order_by()
+
+    count_dict = defaultdict(dict)
+    for item in result:
+        count_dict[item['issues__assign_id']][item['bucket'].date()] = item['ct']
+
+    day_list = list(iter_buckets(start, end, bucket))
+    series = []
+    name_dict = dict(member_list)
+    name_dict[None] = '未指派'
+    # 已退出项目的成员排在最后，用用户ID作为名称
+    for user_id in list(name_dict) + [user_id for user_id in count_dict if user_id not in name_dict]:
+        if user_id not in count_dict:
+            continue
+        name = name_dict.get(user_id, str(user_id))
+        series.append({'name': name, 'data': [count_dict[user_id].get(day, 0) for day in day_list]})
+    return {'categories': [_bucket_label(day, start) for day in day_list], 'series': series}
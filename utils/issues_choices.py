@@ -0,0 +1,54 @@
+import json
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from app import models
+from utils.project_index import get_project_roster, delete_after_commit
+
+
+def _get_choices_key(project_id):
+    return f'issues_choices_{project_id}'
+
+
+def build_issues_choices(project_id):
+    """ 从数据库读取项目的问题类型和模块选项。 """
+    return {
+        'issues_type': list(models.IssuesType.objects.filter(project_id=project_id).order_by('id').values_list('id', 'title')),
+        'module': list(models.Module.objects.filter(project_id=project_id).order_by('id').values_list('id', 'title')),
+    }
+
+
+def get_issues_choices(project):
+    """
+    获取问题表单的下拉选项：问题类型、模块和项目成员，优先读取Redis缓存。
+    - 问题类型和模块只在创建项目时生成，缓存到过期为止；项目成员使用 get_project_roster 的缓存。
+    - Redis不可用时直接返回数据库中的结果。
+
+    :return: {'issues_type': [(ID, 名称), ...], 'module': [...], 'member': [(用户ID, 用户名), ...]}
+    """
+    redis_key = _get_choices_key(project.id)
+    choices = None
+    try:
+        conn = get_redis_connection()
+        choices_string = conn.get(redis_key)
+        if choices_string:
+            choices = {name: [tuple(item) for item in item_list] for name, item_list in json.loads(choices_string).items()}
+    except Exception:
+        conn = None
+
+    if choices is None:
+        choices = build_issues_choices(project.id)
+        if conn is not None:
+            try:
+                conn.set(redis_key, json.dumps(choices), ex=settings.PROJECT_INDEX_CACHE_SECONDS)
+            except Exception:
+                pass
+
+    choices['member'] = get_project_roster(project)
+    return choices
+
+
+def invalidate_issues_choices(project_id):
+    """ 删除项目的问题类型和模块选项缓存（删除项目时调用）。 """
+    delete_after_commit([_get_choices_key(project_id)])
@@ -0,0 +1,131 @@
+import csv
+import itertools
+import json
+from collections import defaultdict
+
+from app import models
+from utils.issues_choices import get_issues_choices
+
+# 导出的列: (列名, 表头)
+EXPORT_COLUMNS = [
+    ('id', 'ID'),
+    ('subject', '主题'),
+    ('desc', '描述'),
+    ('issues_type', '问题类型'),
+    ('module', '模块'),
+    ('status', '状态'),
+    ('priority', '优先级'),
+    ('mode', '模式'),
+    ('assign', '指派'),
+    ('attention', '关注者'),
+    ('creator', '创建者'),
+    ('parent_id', '父问题'),
+    ('start_date', '开始时间'),
+    ('end_date', '结束时间'),
+    ('create_datetime', '创建时间'),
+    ('latest_update_datetime', '最后更新时间'),
+]
+
+VALUE_FIELDS = [
+    'id', 'subject', 'desc', 'issues_type_id', 'module_id', 'status', 'priority', 'mode', 'assign_id', 'creator_id',
+    'parent_id', 'start_date', 'end_date', 'create_datetime', 'latest_update_datetime',
+]
+
+# 以这些字符开头的单元格会被 Excel 等表格软件当作公式执行，导出CSV时在前面加 ' 转义
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """ 只实现 write() 的伪文件对象，csv.writer 写入一行时直接返回该行字符串。 """
+
+    def write(self, value):
+        return value
+
+
+def iter_issues_rows(queryset, project, chunk_size):
+    """
+    按 id 顺序流式读取问题，逐行生成导出用的字典。
+    - values() + iterator(chunk_size) 不实例化模型，内存占用与导出行数无关；
+    - 类型、模块、成员名称来自缓存的项目选项，状态等取自 choices，不按行查询外键；
+    - 关注者每 chunk_size 行用一条查询取出。
+    """
+    choices = get_issues_choices(project)
+    type_dict = dict(choices['issues_type'])
+    module_dict = dict(choices['module'])
+    user_dict = dict(choices['member'])
+    status_dict = dict(models.Issues.status_choices)
+    priority_dict = dict(models.Issues.priority_choices)
+    mode_dict = dict(models.Issues.mode_choices)
+    attention_queryset = models.Issues.attention.through.objects
+
+    row_iterator = queryset.order_by('id').values(*VALUE_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        row_list = list(itertools.islice(row_iterator, chunk_size))
+        if not row_list:
+            break
+        attention_dict = defaultdict(list)
+        for issues_id, user_id in attention_queryset.filter(
+            issues_id__in=[row['id'] for row in row_list]
+        ).order_by('id').values_list('issues_id', 'userinfo_id'):
+            attention_dict[issues_id].append(user_dict.get(user_id, str(user_id)))
+
+        for row in row_list:
+            yield {
+                'id': row['id'],
+                'subject': row['subject'],
+                'desc': row['desc'],
+                'issues_type': type_dict.get(row['issues_type_id'], ''),
+                'module': module_dict.get(row['module_id'], ''),
+                'status': status_dict.get(row['status'], ''),
+                'priority': priority_dict.get(row['priority'], ''),
+                'mode': mode_dict.get(row['mode'], ''),
+                'assign': user_dict.get(row['assign_id'], '') if row['assign_id'] else '',
+                'attention': attention_dict[row['id']],
+                'creator': user_dict.get(row['creator_id'], str(row['creator_id'])),
+                'parent_id': row['parent_id'],
+                'start_date': row['start_date'].isoformat() if row['start_date'] else None,
+                'end_date': row['end_date'].isoformat() if row['end_date'] else None,
+                'create_datetime': row['create_datetime'].strftime('%Y-%m-%d %H:%M:%S'),
+                'latest_update_datetime': row['latest_update_datetime'].strftime('%Y-%m-%d %H:%M:%S'),
+            }
+
+
+def _join_lines(line_iterator, batch_rows=500):
+    """ 把若干行合并为一块再输出，避免每行一次网络写入。 """
+    while True:
+        lines = list(itertools.islice(line_iterator, batch_rows))
+        if not lines:
+            break
+        yield ''.join(lines)
+
+
+def escape_formula(value):
+    """ 以公式字符开头的文本前加 '，防止用表格软件打开导出文件时执行公式（CSV注入）。 """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def unescape_formula(value):
+    """ escape_formula 的逆操作，导入CSV时还原单元格内容。 """
+    if value and value[0] == "'" and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def iter_csv(row_iterator):
+    """ 生成CSV内容，开头带BOM以便Excel识别UTF-8，多个关注者用逗号分隔，公式字符开头的单元格转义。 """
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow([title for _, title in EXPORT_COLUMNS])
+    yield from _join_lines(
+        writer.writerow([
+            escape_formula(','.join(row[name]) if name == 'attention' else ('' if row[name] is None else row[name]))
+            for name, _ in EXPORT_COLUMNS
+        ])
+        for row in row_iterator
+    )
+
+
+def iter_ndjson(row_iterator):
+    """ 生成NDJSON内容，每行一个问题。 """
+    yield from _join_lines(json.dumps(row, ensure_ascii=False) + '\n' for row in row_iterator)
@@ -1,4 +1,147 @@
+import datetime
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.db.models import Exists, OuterRef, Q
+
 from app import models
+from utils.project_index import get_project_roster
+
+
+# 数据库整数主键的最大值，超出的ID在查询时会溢出
+MAX_ID = 2 ** 63 - 1
+
+
+def _normalize_int_list(value):
+    """ '7,1,x,1' -> '1,7'：只保留整数并去重排序，超出主键范围的值丢弃。 """
+    id_set = {int(item) for item in value.split(',') if item.strip().isdecimal()}
+    return ','.join(str(item) for item in sorted(id_set) if item <= MAX_ID)
+
+
+def _choice_normalizer(choices):
+    """ 生成只保留合法选项的规范化函数，多个值用逗号分隔。 """
+    valid_values = {str(key) for key, _ in choices}
+
+    def normalize(value):
+        return ','.join(sorted({item.strip() for item in value.split(',')} & valid_values))
+    return normalize
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def _normalize_date_range(value):
+    """ '2024-01-01~2024-01-31'，任一端可以为空；非法日期视为未填写。 """
+    start, _, end = value.partition('~')
+    start, end = _parse_date(start), _parse_date(end)
+    if not start and not end:
+        return ''
+    return f"{start or ''}~{end or ''}"
+
+
+def _normalize_prefix(value):
+    return value.strip()[:80]
+
+
+# 支持的筛选参数及其规范化函数，规范化结果为空时忽略该参数
+FILTER_NORMALIZERS = {
+    'status': _choice_normalizer(models.Issues.status_choices),
+    'priority': _choice_normalizer(models.Issues.priority_choices),
+    'assign': _normalize_int_list,
+    'attention': _normalize_int_list,
+    'issues_type': _normalize_int_list,
+    'module': _normalize_int_list,
+    'create_datetime': _normalize_date_range,
+    'end_date': _normalize_date_range,
+    'subject': _normalize_prefix,
+}
+
+
+def _date_range_bounds(value):
+    start, _, end = value.partition('~')
+    return _parse_date(start) if start else None, _parse_date(end) if end else None
+
+
+@lru_cache(maxsize=512)
+def _parse_filter(normalized_items):
+    """
+    将规范化后的筛选条件解析为字段查询列表，结果按规范化的条件缓存，相同筛选不再重复解析。
+    缓存中只保存不可变的普通值，不保存 Q 对象或查询集，可以在请求和线程之间安全共享。
+
+    :return: ((字段查询, 值), ...)；关注者条件的字段查询为 'attention'，值为用户ID元组。
+    """
+    lookups = []
+    for param, value in normalized_items:
+        if param in ('status', 'priority', 'assign', 'issues_type', 'module'):
+            field_name = param if param in ('status', 'priority') else f"{param}_id"
+            value_list = value.split(',')
+            if param != 'priority':
+                value_list = [int(item) for item in value_list]
+            lookups.append((f"{field_name}__in", tuple(value_list)))
+        elif param == 'attention':
+            lookups.append(('attention', tuple(int(item) for item in value.split(','))))
+        elif param == 'create_datetime':
+            start, end = _date_range_bounds(value)
+            if start:
+                lookups.append(('create_datetime__gte', datetime.datetime.combine(start, datetime.time.min)))
+            if end:
+                # 用当天的最后时刻而不是第二天零点作为上限，结束日期为 9999-12-31 时不会溢出
+                lookups.append(('create_datetime__lte', datetime.datetime.combine(end, datetime.time.max)))
+        elif param == 'end_date':
+            start, end = _date_range_bounds(value)
+            if start:
+                lookups.append(('end_date__gte', start))
+            if end:
+                lookups.append(('end_date__lte', end))
+        elif param == 'subject':
+            lookups.append(('subject__startswith', value))
+    return tuple(lookups)
+
+
+def compile_filter(normalized_items):
+    """
+    将规范化后的筛选条件编译为一个 Q 对象。解析结果由 _parse_filter 缓存，Q 对象每次调用重新构造。
+
+    - 多选: status=1,2,7 -> status IN (1, 2, 7)
+    - 日期范围: create_datetime=2024-01-01~2024-01-31（含首尾两天），end_date=~2024-03-01
+    - 主题前缀: subject=登录 -> subject LIKE '登录%'
+    - 关注者是多对多字段，用 EXISTS 子查询代替 JOIN，不会产生重复行，也不需要 distinct()
+
+    :param normalized_items: ((参数名, 规范化的值), ...)，由 normalize_filter_params 生成。
+    """
+    condition = Q()
+    for lookup, value in _parse_filter(normalized_items):
+        if lookup == 'attention':
+            through_queryset = models.Issues.attention.through.objects.filter(
+                issues_id=OuterRef('pk'), userinfo_id__in=value
+            )
+            condition &= Q(Exists(through_queryset))
+        else:
+            condition &= Q(**{lookup: value})
+    return condition
+
+
+def normalize_filter_params(allowed_filters, query_params):
+    """
+    校验并规范化筛选参数：非法值被丢弃，多选值去重排序。
+    :param allowed_filters: 允许使用的筛选参数名。
+    :param query_params: 查询参数，例如 request.GET。
+    :return: ((参数名, 规范化的值), ...)，按参数名排序，可作为 compile_filter 的参数和缓存的key。
+    """
+    items = []
+    for param in sorted(allowed_filters):
+        value = query_params.get(param)
+        normalizer = FILTER_NORMALIZERS.get(param)
+        if value and normalizer:
+            value = normalizer(value)
+            if value:
+                items.append((param, value))
+    return tuple(items)
+
 
 class CheckFilter:
     """
@@ -9,26 +152,21 @@ class CheckFilter:
         self.allowed_filters = allowed_filters
         self.request = request
 
+    def get_normalized_items(self):
+        """ 校验并规范化URL中的筛选参数，见 normalize_filter_params。 """
+        return normalize_filter_params(self.allowed_filters, self.request.GET)
+
     def get_query_conditions(self):
         """
-        根据URL参数生成数据库查询条件。
-        (已修正此处的逻辑)
+        根据URL参数生成数据库查询条件（Q 对象），用法: queryset.filter(filter_handler.get_query_conditions())。
         """
-        conditions = {}
-        for param in self.allowed_filters:
-            value = self.request.GET.get(param)
-            if value:
-                # 只有当字段是外键或多对多关系时，才可能需要加_id或特殊处理。
-                # 对于status和priority这种普通字段，直接使用字段名。
-                if param in ['status', 'priority']:
-                    conditions[param] = value
-                elif param == 'attention':
-                    # 'attention' 是多对多字段，查询键直接是字段名
-                    conditions[param] = value
-                else:
-                    # 其他（如assign）是外键，需要加_id后缀
-                    conditions[f"{param}_id"] = value
-        return conditions
+        return compile_filter(self.get_normalized_items())
+
+    def get_filter_query(self):
+        """ 去掉页码后的查询字符串：筛选面板的内容只与筛选条件有关，可作为片段缓存的 vary_on。 """
+        query_params = self.request.GET.copy()
+        query_params.pop('page', None)
+        return query_params.urlencode()
 
     def get_filter_choices(self):
         """为模板准备所有筛选器的选项数据。"""
@@ -44,42 +182,47 @@ class CheckFilter:
         return filter_choices
 
     def _build_check_choices(self, param_name, choices_data):
-        """为链接式筛选器（如状态、优先级）构建选项。"""
+        """
+        为链接式筛选器（如状态、优先级）构建选项。
+        去掉当前参数后的查询字符串只编码一次，每个选项的URL只需拼接 "参数=值"。
+        筛选条件变化后从第一页开始，选项的URL不带页码。
+        """
         query_params = self.request.GET.copy()
         current_value = query_params.get(param_name)
         option_list = []
 
         query_params.pop(param_name, None)
+        query_params.pop('page', None)
+        base_query = query_params.urlencode()
         option_list.append({
             'text': '全部',
-            'url': f"?{query_params.urlencode()}",
+            'url': f"?{base_query}",
             'active': not current_value
         })
 
+        url_prefix = f"?{base_query}&{quote(param_name)}=" if base_query else f"?{quote(param_name)}="
+        current_values = set(current_value.split(',')) if current_value else set()
         for key, text in choices_data:
-            query_params[param_name] = key
             option_list.append({
                 'text': text,
-                'url': f"?{query_params.urlencode()}",
-                'active': str(key) == current_value
+                'url': f"{url_prefix}{quote(str(key))}",
+                'active': str(key) in current_values
             })
         return option_list
 
     def _build_select_options(self, param_name, choices_data):
         """为<select>下拉筛选器（如指派人）构建选项。"""
         current_value = self.request.GET.get(param_name)
+        current_values = set(current_value.split(',')) if current_value else set()
         option_list = []
         for key, text in choices_data:
             option_list.append({
                 'value': key,
                 'text': text,
-                'selected': str(key) == current_value
+                'selected': str(key) in current_values
             })
         return option_list
 
     def _get_project_members(self, project):
-        """获取项目成员列表作为筛选选项。"""
-        members = [(project.creator.id, project.creator.username)]
-        project_users = models.ProjectUser.objects.filter(project=project).values_list('user_id', 'user__username')
-        members.extend(project_users)
-        return members
+        """获取项目成员列表作为筛选选项，数据来自缓存的项目成员名单。"""
+        return get_project_roster(project)
@@ -0,0 +1,230 @@
+import csv
+import io
+import itertools
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from app import models
+from app.forms.issues import IssuesModelForm
+from utils.fragment_cache import bump_project_version
+from utils.issues_choices import get_issues_choices
+from utils.issues_export import EXPORT_COLUMNS, unescape_formula
+from utils.issues_tree import invalidate_issues_tree
+
+# 导入文件的表头可以是字段名，也可以是导出文件的中文表头
+HEADER_ALIASES = {title: name for name, title in EXPORT_COLUMNS}
+HEADER_ALIASES.update({'问题描述': 'desc', '父问题ID': 'parent_id'})
+
+# 直接用 IssuesModelForm 的字段校验的列（不查询数据库）
+SCALAR_FIELDS = ['subject', 'desc', 'status', 'priority', 'mode', 'start_date', 'end_date']
+# 文件中没有这些列时使用模型的默认值；有列但值为空时按表单规则校验。主题、描述等必填列没有默认值
+DEFAULT_VALUES = {'status': 1, 'priority': 'danger', 'mode': 1}
+# JSON中不是对象的数据项在错误信息中使用的列名
+INVALID_ROW_KEY = '数据'
+CHOICE_LABELS = {
+    'status': {text: key for key, text in models.Issues.status_choices},
+    'priority': {text: key for key, text in models.Issues.priority_choices},
+    'mode': {text: key for key, text in models.Issues.mode_choices},
+}
+
+
+def iter_import_rows(file_object, file_format):
+    """
+    流式解析导入文件，逐行生成 {列名: 字符串值} 字典；JSON中不是对象的数据项生成 None，由导入时记为错误行。
+    :param file_object: 二进制文件对象。
+    :param file_format: 'csv' 或 'json'（JSON数组或每行一个对象的NDJSON）。
+                        CSV中导出时为防止公式执行而加的 ' 会被去掉。
+    """
+    text_stream = io.TextIOWrapper(file_object, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        # field_size_limit 是进程级的设置，只调大不调小
+        csv.field_size_limit(max(csv.field_size_limit(), settings.ISSUES_IMPORT_MAX_FIELD_SIZE))
+        for row in csv.DictReader(text_stream):
+            yield {
+                HEADER_ALIASES.get(key.strip(), key.strip()): unescape_formula(value) for key, value in row.items() if key
+            }
+        return
+
+    first_char = text_stream.read(1)
+    while first_char.isspace():
+        first_char = text_stream.read(1)
+    if first_char == '[':
+        # JSON数组需要整体解析，大文件建议使用NDJSON
+        item_list = json.loads(first_char + text_stream.read())
+    else:
+        item_list = (json.loads(line) for line in itertools.chain([first_char + text_stream.readline()], text_stream)
+                     if line.strip())
+    for item in item_list:
+        if not isinstance(item, dict):
+            yield None
+            continue
+        yield {HEADER_ALIASES.get(key, key): value for key, value in item.items()}
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ','.join(str(item) for item in value)
+    return str(value).strip()
+
+
+class IssuesImporter:
+    """
+    批量导入问题。
+
+    - 每 chunk_size 行为一批：问题类型、模块、成员的名称和ID来自缓存的项目选项，
+      父问题每批一条查询，其余字段用 IssuesModelForm 的字段规则逐行校验，不按行查询数据库；
+    - 合法的行按批 bulk_create，关注者再按批写入中间表；有错误的行跳过并记录行号和错误信息；
+    - 整个导入在一个事务中完成，中途出现数据库异常时全部回滚。
+
+    使用示例:
+        importer = IssuesImporter(project, user)
+        created = importer.run(iter_import_rows(file_object, 'csv'))
+        importer.error_list  # [{'row': 数据行号（从1开始，不含表头）, 'errors': {列名: 错误信息}}, ...]
+    """
+
+    def __init__(self, project, creator, chunk_size=1000, max_errors=100):
+        self.project = project
+        self.creator = creator
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.error_count = 0
+        self.error_list = []
+        self.parent_ids = set()
+
+        choices = get_issues_choices(project)
+        self.lookup = {
+            'issues_type': self._build_lookup(choices['issues_type']),
+            'module': self._build_lookup(choices['module']),
+            'member': self._build_lookup(choices['member']),
+        }
+        self.form_fields = IssuesModelForm.base_fields
+        self.clean_cache = {}
+
+    @staticmethod
+    def _build_lookup(choices):
+        """ 名称和ID（字符串）都可以引用同一个选项。 """
+        lookup = {str(key): key for key, _ in choices}
+        lookup.update({text: key for key, text in choices})
+        return lookup
+
+    def run(self, row_iterator):
+        """
+        :return: 成功创建的问题数。
+        """
+        created = 0
+        row_number = 1
+        with transaction.atomic():
+            while True:
+                row_list = list(itertools.islice(row_iterator, self.chunk_size))
+                if not row_list:
+                    break
+                created += self._import_chunk(row_list, row_number)
+                row_number += len(row_list)
+            if created:
+                invalidate_issues_tree(self.parent_ids)
+                bump_project_version(self.project.id)
+        return created
+
+    def _import_chunk(self, row_list, first_row_number):
+        parent_text_list = [_to_text(row.get('parent_id')).lstrip('#') for row in row_list if row is not None]
+        existing_parent_ids = set(models.Issues.objects.filter(
+            project=self.project, id__in=[int(text) for text in parent_text_list if text.isdecimal()]
+        ).values_list('id', flat=True))
+
+        issues_list = []
+        attention_list = []
+        for index, row in enumerate(row_list):
+            issue, attention_ids, errors = self._build_issue(row, existing_parent_ids)
+            if errors:
+                self._add_error(first_row_number + index, errors)
+                continue
+            issues_list.append(issue)
+            attention_list.append(attention_ids)
+
+        models.Issues.objects.bulk_create(issues_list)
+        through_model = models.Issues.attention.through
+        through_model.objects.bulk_create([
+            through_model(issues_id=issue.id, userinfo_id=user_id)
+            for issue, attention_ids in zip(issues_list, attention_list)
+            for user_id in attention_ids
+        ])
+        self.parent_ids.update(issue.parent_id for issue in issues_list if issue.parent_id)
+        return len(issues_list)
+
+    def _clean_scalar(self, name, text):
+        """
+        用表单字段校验一个值。状态、优先级、日期等列的取值重复度很高，按 (列名, 值) 缓存校验结果。
+        :return: (校验后的值, 错误信息)
+        """
+        cache_key = (name, text)
+        if cache_key in self.clean_cache:
+            return self.clean_cache[cache_key]
+        try:
+            result = self.form_fields[name].clean(str(CHOICE_LABELS.get(name, {}).get(text, text))), None
+        except ValidationError as e:
+            result = None, e.messages[0]
+        if name not in ('subject', 'desc'):
+            self.clean_cache[cache_key] = result
+        return result
+
+    def _build_issue(self, row, existing_parent_ids):
+        """
+        校验一行数据并构造问题对象（不保存）。
+        :return: (问题对象, 关注者ID集合, 错误字典)；有错误时前两项为 None。
+        """
+        if row is None:
+            return None, None, {INVALID_ROW_KEY: '必须是JSON对象'}
+        values = {}
+        errors = {}
+        for name in SCALAR_FIELDS:
+            if name not in row and name in DEFAULT_VALUES:
+                values[name] = DEFAULT_VALUES[name]
+                continue
+            text = _to_text(row.get(name))
+            value, error = self._clean_scalar(name, text)
+            if error:
+                errors[name] = error
+            else:
+                values[name] = value
+
+        for name in ['issues_type', 'module', 'assign']:
+            text = _to_text(row.get(name))
+            lookup = self.lookup['member' if name == 'assign' else name]
+            if not text:
+                if self.form_fields[name].required:
+                    errors[name] = self.form_fields[name].error_messages['required']
+                values[f'{name}_id'] = None
+            elif text in lookup:
+                values[f'{name}_id'] = lookup[text]
+            else:
+                errors[name] = f'“{text}”不存在'
+
+        attention_ids = []
+        for text in filter(None, (item.strip() for item in _to_text(row.get('attention')).split(','))):
+            if text in self.lookup['member']:
+                attention_ids.append(self.lookup['member'][text])
+            else:
+                errors['attention'] = f'“{text}”不是项目成员'
+
+        parent_text = _to_text(row.get('parent_id')).lstrip('#')
+        values['parent_id'] = None
+        if parent_text:
+            if parent_text.isdecimal() and int(parent_text) in existing_parent_ids:
+                values['parent_id'] = int(parent_text)
+            else:
+                errors['parent_id'] = f'父问题“{parent_text}”不存在'
+
+        if errors:
+            return None, None, errors
+        issue = models.Issues(project=self.project, creator=self.creator, **values)
+        return issue, set(attention_ids), None
+
+    def _add_error(self, row_number, errors):
+        self.error_count += 1
+        if len(self.error_list) < self.max_errors:
+            self.error_list.append({'row': row_number, 'errors': errors})
@@ -0,0 +1,112 @@
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+
+from app import models
+
+
+class IssuesTimelinePager:
+    """
+    问题操作记录（变更记录 + 回复）的游标（keyset）分页组件。
+
+    - 记录按 (create_datetime, id) 从新到旧分页，命中 (issues, create_datetime, id) 复合索引，
+      翻页代价与已加载的记录数无关；新记录总是出现在第一页的最前面。
+    - 游标记录一行的 (create_datetime, id)：cursor 取比它更旧的一页，since 取比它更新的记录。
+
+    在视图函数中使用示例:
+        pager = IssuesTimelinePager(issues_id, reply_type=request.GET.get('reply_type'),
+                                    cursor=request.GET.get('cursor'))
+        record_list, next_cursor = pager.get_page()
+    """
+
+    def __init__(self, issues_id, reply_type=None, cursor=None, per_page=50):
+        """
+        :param issues_id: 问题ID。
+        :param reply_type: 只返回指定类型的记录（1 变更记录，2 回复），非法值或为空时返回全部。
+        :param cursor: 上一页返回的游标，为空时返回第一页。
+        :param per_page: 每页条数。
+        """
+        self.issues_id = issues_id
+        valid_types = {str(key) for key, _ in models.IssuesReply.reply_type_choices}
+        self.reply_type = int(reply_type) if reply_type in valid_types else None
+        self.per_page = per_page
+        self.cursor = self.decode_cursor(cursor)
+
+    def _get_queryset(self):
+        queryset = models.IssuesReply.objects.filter(issues_id=self.issues_id).select_related('creator')
+        if self.reply_type:
+            queryset = queryset.filter(reply_type=self.reply_type)
+        return queryset
+
+    def get_page(self):
+        """
+        :return: (当前页的 IssuesReply 对象列表（从新到旧）, 下一页（更旧的记录）的游标；没有下一页时为 None)
+        """
+        queryset = self._get_queryset()
+        if self.cursor:
+            value, last_id = self.cursor
+            queryset = queryset.filter(Q(create_datetime__lt=value) | Q(create_datetime=value, id__lt=last_id))
+        record_list = list(queryset.order_by('-create_datetime', '-id')[:self.per_page + 1])
+        if len(record_list) <= self.per_page:
+            return record_list, None
+
+        record_list = record_list[:self.per_page]
+        return record_list, self.encode_cursor(record_list[-1])
+
+    def get_newer(self, since):
+        """
+        取比 since 游标更新的记录，用于在已加载的时间线顶部补充新记录。
+        :return: (记录列表（从旧到新）, 是否还有更多)；游标非法或新记录超过一页时，前端应重新加载第一页。
+        """
+        since = self.decode_cursor(since)
+        if not since:
+            return [], True
+        value, last_id = since
+        queryset = self._get_queryset().filter(Q(create_datetime__gt=value) | Q(create_datetime=value, id__gt=last_id))
+        record_list = list(queryset.order_by('create_datetime', 'id')[:self.per_page + 1])
+        if len(record_list) > self.per_page:
+            return [], True
+        return record_list, False
+
+    @staticmethod
+    def encode_cursor(instance):
+        data = json.dumps([instance.create_datetime.isoformat(), instance.id])
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('utf-8')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """解析游标，非法游标视为从第一页开始。"""
+        if not cursor:
+            return None
+        try:
+            value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')))
+            return datetime.datetime.fromisoformat(value), int(last_id)
+        except (ValueError, TypeError):
+            return None
+
+
+def build_record_tree(data_list, newest_first=False):
+    """
+    把记录字典组装成回复树，一次遍历完成。
+    回复总是晚于被回复的记录创建，按从旧到新遍历时父记录已经在字典中；子记录按从旧到新排列。
+    父记录不在当前页（在其他页中或被类型筛选掉）的记录作为顶层节点返回，保留 reply_id 供前端挂到已加载的节点下。
+
+    :param data_list: 记录字典列表，需要 id 和 reply_id。
+    :param newest_first: data_list 是否从新到旧排列；顶层记录保持 data_list 的顺序。
+    :return: 顶层记录列表，每条记录的 children 为其直接回复。
+    """
+    node_dict = {}
+    root_list = []
+    for item in (reversed(data_list) if newest_first else data_list):
+        item['children'] = []
+        node_dict[item['id']] = item
+        parent = node_dict.get(item['reply_id'])
+        if parent:
+            parent['children'].append(item)
+        else:
+            root_list.append(item)
+    if newest_first:
+        root_list.reverse()
+    return root_list
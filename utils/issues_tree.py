@@ -0,0 +1,90 @@
+import json
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from app import models
+from utils.project_index import delete_after_commit
+
+# 计为已完成的状态：已解决、已关闭；已忽略的问题不计入完成度
+DONE_STATUS = {3, 6}
+IGNORED_STATUS = {4}
+
+
+def _get_tree_key(issues_id):
+    return f'issues_tree_{issues_id}'
+
+
+def build_issues_tree(row_list):
+    """
+    把 Issues.objects.descendants() 的结果组装成子问题树，并自底向上汇总完成度，各遍历一次。
+
+    每个节点增加:
+        children: 直接子问题列表。
+        total / done: 以该节点为根的子树中（含自身，不含已忽略）的问题数和已完成数。
+        percent: 完成百分比（整数），子树全部被忽略时为 None。
+    根节点另外增加 status_count: 整棵树中各状态的问题数 {状态: 数量}。
+    :return: 根节点；问题不存在时为 None。
+    """
+    node_dict = {}
+    node_list = []
+    for row in row_list:
+        # 层级中存在环时同一个问题会在更深的层级重复出现，只保留第一次
+        if row['id'] in node_dict:
+            continue
+        row['children'] = []
+        row['total'] = 0 if row['status'] in IGNORED_STATUS else 1
+        row['done'] = 1 if row['status'] in DONE_STATUS else 0
+        node_dict[row['id']] = row
+        node_list.append(row)
+        parent = node_dict.get(row['parent_id']) if row['depth'] else None
+        if parent:
+            parent['children'].append(row)
+
+    # 结果按层级排列，倒序遍历时子问题总是先于父问题汇总
+    for row in reversed(node_list):
+        row['percent'] = round(row['done'] * 100 / row['total']) if row['total'] else None
+        parent = node_dict.get(row['parent_id']) if row['depth'] else None
+        if parent:
+            parent['total'] += row['total']
+            parent['done'] += row['done']
+    if not node_list:
+        return None
+
+    root = node_list[0]
+    root['status_count'] = {}
+    for row in node_list:
+        root['status_count'][row['status']] = root['status_count'].get(row['status'], 0) + 1
+    return root
+
+
+def get_issues_tree(issues_id):
+    """
+    获取问题的子问题树（含完成度汇总），优先读取Redis缓存，缓存按根问题保存。
+    树中任意问题的状态、主题或父问题变化时，由 invalidate_issues_tree 删除其所有祖先问题的缓存。
+    Redis不可用时直接返回数据库中的结果。
+    """
+    redis_key = _get_tree_key(issues_id)
+    try:
+        conn = get_redis_connection()
+        tree_string = conn.get(redis_key)
+        if tree_string:
+            return json.loads(tree_string)
+    except Exception:
+        return build_issues_tree(models.Issues.objects.descendants(issues_id))
+
+    tree = build_issues_tree(models.Issues.objects.descendants(issues_id))
+    try:
+        conn.set(redis_key, json.dumps(tree), ex=settings.ISSUES_TREE_CACHE_SECONDS)
+    except Exception:
+        pass
+    return tree
+
+
+def invalidate_issues_tree(issues_ids):
+    """
+    删除包含这些问题的所有子问题树缓存（问题本身及其全部祖先问题）。
+    祖先按调用时数据库中的层级计算：修改父问题时，需要在保存前后各调用一次，分别失效旧的和新的祖先。
+    """
+    ancestor_ids = models.Issues.objects.ancestor_ids(issues_ids)
+    delete_after_commit([_get_tree_key(issues_id) for issues_id in ancestor_ids])
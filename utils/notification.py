@@ -0,0 +1,189 @@
+import datetime
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from app import models
+
+QUEUE_KEY = 'notification_queue'
+DEAD_LETTER_KEY = 'notification_dead_letter'
+
+
+def emit_issues_events(event_list):
+    """
+    把问题变更事件放入Redis队列，由 scripts/notification_worker.py 在后台分发给指派人和关注者。
+    在事务中调用时，等事务提交后再入队；Redis不可用时丢弃事件，不影响发起变更的请求。
+
+    :param event_list: [(问题ID, 操作者ID, 变更内容), ...]
+    """
+    now = datetime.datetime.now().isoformat()
+    payload_list = [
+        json.dumps({'issues_id': issues_id, 'actor_id': actor_id, 'content': content, 'datetime': now})
+        for issues_id, actor_id, content in event_list
+    ]
+
+    def push():
+        try:
+            get_redis_connection().rpush(QUEUE_KEY, *payload_list)
+        except Exception:
+            pass
+
+    if payload_list:
+        transaction.on_commit(push)
+
+
+def pop_events(conn, batch_size, timeout=5):
+    """
+    从队列中取出一批事件：阻塞等待第一个事件（最多 timeout 秒），再一次取出其余已到达的事件。
+    :return: 事件字典列表，超时时为空列表。
+    """
+    item = conn.blpop(QUEUE_KEY, timeout=timeout)
+    if not item:
+        return []
+    payload_list = [item[1]]
+    if batch_size > 1:
+        # LRANGE + LTRIM 在同一个事务中执行，多个worker并发时不会重复取出
+        pipe = conn.pipeline()
+        pipe.lrange(QUEUE_KEY, 0, batch_size - 2)
+        pipe.ltrim(QUEUE_KEY, batch_size - 1, -1)
+        payload_list.extend(pipe.execute()[0])
+    return [json.loads(payload) for payload in payload_list]
+
+
+def requeue_events(conn, event_list):
+    """
+    处理失败的一批事件重新放回队列，等待下一批处理；每个事件最多尝试 NOTIFICATION_MAX_ATTEMPTS 次，
+    超过后放入死信队列，避免无法处理的事件反复失败，也不会因为一次数据库故障丢失整批事件。
+
+    :return: (重新入队的事件数, 移入死信队列的事件数)
+    """
+    retry_list = []
+    dead_list = []
+    for event in event_list:
+        event['attempts'] = event.get('attempts', 0) + 1
+        payload = json.dumps(event)
+        if event['attempts'] < settings.NOTIFICATION_MAX_ATTEMPTS:
+            retry_list.append(payload)
+        else:
+            dead_list.append(payload)
+
+    pipe = conn.pipeline()
+    if retry_list:
+        pipe.rpush(QUEUE_KEY, *retry_list)
+    if dead_list:
+        pipe.rpush(DEAD_LETTER_KEY, *dead_list)
+    pipe.execute()
+    return len(retry_list), len(dead_list)
+
+
+def _merge_content(content, line_list):
+    """ 合并通知内容，只保留最近的 NOTIFICATION_CONTENT_LINES 行。 """
+    lines = (content.splitlines() if content else []) + line_list
+    return '\n'.join(lines[-settings.NOTIFICATION_CONTENT_LINES:])
+
+
+def process_events(event_list):
+    """
+    把一批事件分发给每个问题的指派人和关注者（不通知操作者本人），写入收件箱。
+    - 同一批中同一接收者、同一问题的事件合并为一条；
+    - 接收者在 NOTIFICATION_COALESCE_SECONDS 内还有该问题的未读通知时，合并到那条通知中，而不是新建。
+    整批只需要固定次数的查询：问题、关注者、可合并的通知各一次，再加一次 bulk_update 和一次 bulk_create。
+
+    :return: (新建的通知数, 合并的通知数)
+    """
+    issues_ids = {event['issues_id'] for event in event_list}
+    issues_dict = {
+        item['id']: item
+        for item in models.Issues.objects.filter(id__in=issues_ids).values('id', 'project_id', 'assign_id')
+    }
+    attention_dict = defaultdict(set)
+    attention_queryset = models.Issues.attention.through.objects.filter(issues_id__in=issues_ids)
+    for issues_id, user_id in attention_queryset.values_list('issues_id', 'userinfo_id'):
+        attention_dict[issues_id].add(user_id)
+
+    # (接收者ID, 问题ID) -> 本批合并后的通知
+    pending_dict = {}
+    for event in event_list:
+        issue = issues_dict.get(event['issues_id'])
+        if not issue:
+            continue
+        recipient_ids = attention_dict[issue['id']] | ({issue['assign_id']} if issue['assign_id'] else set())
+        recipient_ids.discard(event['actor_id'])
+        for recipient_id in recipient_ids:
+            pending = pending_dict.setdefault((recipient_id, issue['id']), {
+                'project_id': issue['project_id'], 'line_list': [], 'event_count': 0,
+            })
+            pending['line_list'].append(event['content'])
+            pending['event_count'] += 1
+            pending['actor_id'] = event['actor_id']
+            pending['datetime'] = datetime.datetime.fromisoformat(event['datetime'])
+    if not pending_dict:
+        return 0, 0
+
+    cutoff = min(pending['datetime'] for pending in pending_dict.values()) - datetime.timedelta(
+        seconds=settings.NOTIFICATION_COALESCE_SECONDS
+    )
+    existing_dict = {}
+    existing_queryset = models.Notification.objects.filter(
+        recipient_id__in={recipient_id for recipient_id, _ in pending_dict},
+        issues_id__in={issues_id for _, issues_id in pending_dict},
+        is_read=False,
+        update_datetime__gte=cutoff,
+    ).order_by('update_datetime')
+    for notification in existing_queryset:
+        # 同一接收者、同一问题有多条时，合并到最近的一条
+        existing_dict[(notification.recipient_id, notification.issues_id)] = notification
+
+    update_list = []
+    create_list = []
+    coalesce_delta = datetime.timedelta(seconds=settings.NOTIFICATION_COALESCE_SECONDS)
+    for (recipient_id, issues_id), pending in pending_dict.items():
+        notification = existing_dict.get((recipient_id, issues_id))
+        if notification and pending['datetime'] - notification.update_datetime <= coalesce_delta:
+            notification.content = _merge_content(notification.content, pending['line_list'])
+            notification.event_count += pending['event_count']
+            notification.actor_id = pending['actor_id']
+            notification.update_datetime = pending['datetime']
+            update_list.append(notification)
+        else:
+            create_list.append(models.Notification(
+                recipient_id=recipient_id,
+                project_id=pending['project_id'],
+                issues_id=issues_id,
+                actor_id=pending['actor_id'],
+                content=_merge_content('', pending['line_list']),
+                event_count=pending['event_count'],
+                update_datetime=pending['datetime'],
+            ))
+
+    with transaction.atomic():
+        models.Notification.objects.bulk_update(update_list, ['content', 'event_count', 'actor', 'update_datetime'])
+        models.Notification.objects.bulk_create(create_list)
+    return len(create_list), len(update_list)
+
+
+def get_inbox(user, limit):
+    """
+    用户收件箱中最近的未读通知，一条查询命中 (recipient, is_read, update_datetime) 索引。
+    """
+    queryset = models.Notification.objects.filter(recipient=user, is_read=False).select_related(
+        'issues', 'actor'
+    ).only(
+        'project_id', 'issues_id', 'content', 'event_count', 'update_datetime', 'issues__subject', 'actor__username'
+    ).order_by('-update_datetime')[:limit]
+    return [
+        {
+            'id': item.id,
+            'project_id': item.project_id,
+            'issues_id': item.issues_id,
+            'subject': item.issues.subject,
+            'actor_name': item.actor.username,
+            'content': item.content,
+            'event_count': item.event_count,
+            'update_datetime': item.update_datetime.strftime('%Y-%m-%d %H:%M'),
+        }
+        for item in queryset
+    ]
@@ -44,6 +44,10 @@ class Pagination:
         self.base_url = base_url
         self.query_params = query_params.copy()  # 复制一份，避免污染原始数据
         self.query_params._mutable = True
+        # 除页码外的查询字符串只编码一次，生成各页URL时只拼接页码
+        self.query_params.pop('page', None)
+        base_query = self.query_params.urlencode()
+        self.url_prefix = f'{self.base_url}?{base_query}&page=' if base_query else f'{self.base_url}?page='
 
         try:
             self.current_page = int(current_page)
@@ -75,8 +79,7 @@ class Pagination:
 
     def _build_url(self, page):
         """内部方法，用于生成带页码参数的URL"""
-        self.query_params['page'] = page
-        return f'{self.base_url}?{self.query_params.urlencode()}'
+        return f'{self.url_prefix}{page}'
 
     def _get_page_range(self):
         """内部方法，计算要在页面上显示的页码范围"""
@@ -0,0 +1,126 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from app import models
+
+
+def _get_index_key(user_id):
+    return f'project_index_{user_id}'
+
+
+def _get_roster_key(project_id):
+    return f'project_roster_{project_id}'
+
+
+def _project_entry(project, project_type, star):
+    """ 项目列表和导航栏渲染所需的全部字段，星标取自当前用户自己的记录。 """
+    return {
+        'id': project.id,
+        'name': project.name,
+        'color': project.get_color_display(),
+        'star': star,
+        'type': project_type,
+        'creator': project.creator.username,
+        'join_count': project.join_count,
+    }
+
+
+def build_project_index(user):
+    """
+    从数据库构建用户的项目索引：先是自己创建的项目，再是参与的项目（均按创建/加入先后排列）。
+    """
+    index = [
+        _project_entry(project, 'my', project.star)
+        for project in models.Project.objects.filter(creator=user).select_related('creator').order_by('id')
+    ]
+    relation_list = models.ProjectUser.objects.filter(user=user).select_related('project__creator').order_by('id')
+    index.extend(_project_entry(relation.project, 'join', relation.star) for relation in relation_list)
+    return index
+
+
+def get_project_index(user):
+    """
+    获取用户的项目索引，优先读取Redis缓存，缓存未命中时从数据库构建并写回。
+    Redis不可用时直接返回数据库中的结果，不影响页面渲染。
+
+    :return: 项目字典列表，字段见 _project_entry。
+    """
+    redis_key = _get_index_key(user.id)
+    try:
+        conn = get_redis_connection()
+        index_string = conn.get(redis_key)
+        if index_string:
+            return json.loads(index_string)
+    except Exception:
+        return build_project_index(user)
+
+    index = build_project_index(user)
+    try:
+        conn.set(redis_key, json.dumps(index), ex=settings.PROJECT_INDEX_CACHE_SECONDS)
+    except Exception:
+        pass
+    return index
+
+
+def group_project_index(index):
+    """ 将项目索引按 星标 / 我创建的 / 我参与的 分组，星标项目不再出现在后两组中。 """
+    projects_dict = {'star': [], 'my': [], 'join': []}
+    for entry in index:
+        projects_dict['star' if entry['star'] else entry['type']].append(entry)
+    return projects_dict
+
+
+def delete_after_commit(redis_keys):
+    """
+    删除缓存key。在事务中调用时，等事务提交后再删除，避免并发请求把未提交前的旧数据重新写入缓存。
+    """
+    def delete_keys():
+        try:
+            get_redis_connection().delete(*redis_keys)
+        except Exception:
+            pass
+
+    if redis_keys:
+        transaction.on_commit(delete_keys)
+
+
+def invalidate_project_index(user_ids):
+    """ 删除指定用户的项目索引缓存，下次访问时重建。 """
+    delete_after_commit([_get_index_key(user_id) for user_id in set(user_ids)])
+
+
+def invalidate_project_members_index(project):
+    """ 项目本身发生变化（成员加入、删除项目）时，删除项目成员名单以及创建者和所有参与者的项目索引缓存。 """
+    member_ids = list(models.ProjectUser.objects.filter(project=project).values_list('user_id', flat=True))
+    redis_keys = [_get_index_key(user_id) for user_id in {project.creator_id, *member_ids}]
+    delete_after_commit(redis_keys + [_get_roster_key(project.id)])
+
+
+def get_project_roster(project):
+    """
+    获取项目成员名单（创建者在前，参与者按加入先后），优先读取Redis缓存。
+    名单在成员加入或项目删除时由 invalidate_project_members_index 失效。
+
+    :return: [(用户ID, 用户名), ...]
+    """
+    redis_key = _get_roster_key(project.id)
+    try:
+        conn = get_redis_connection()
+        roster_string = conn.get(redis_key)
+        if roster_string:
+            return [tuple(item) for item in json.loads(roster_string)]
+    except Exception:
+        conn = None
+
+    creator = models.UserInfo.objects.filter(id=project.creator_id).values_list('id', 'username').first()
+    roster = [creator] if creator else []
+    roster.extend(models.ProjectUser.objects.filter(project_id=project.id).order_by('id').values_list('user_id', 'user__username'))
+    if conn is not None:
+        try:
+            conn.set(redis_key, json.dumps(roster), ex=settings.PROJECT_INDEX_CACHE_SECONDS)
+        except Exception:
+            pass
+    return roster
@@ -0,0 +1,137 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+
+from app import models
+
+
+def reserve_space(project, user, size, limit):
+    """
+    为一次上传预留项目空间。
+
+    使用单条带条件的 UPDATE 完成“校验 + 预留”，并发签发凭证时也不会超出配额。
+    预留在 SPACE_RESERVATION_SECONDS 后过期，由 release_expired_reservations 回收。
+
+    :param project: 项目对象。
+    :param user: 发起上传的用户。
+    :param size: 需要预留的字节数。
+    :param limit: 项目空间上限（字节）。
+    :return: 预留记录；空间不足时返回 None。
+    """
+    release_expired_reservations(project_id=project.id)
+
+    with transaction.atomic():
+        affected = models.Project.objects.filter(
+            id=project.id,
+            use_space__lte=Value(limit - size) - F('reserve_space')
+        ).update(reserve_space=F('reserve_space') + size)
+        if not affected:
+            return None
+
+        expire_datetime = datetime.datetime.now() + datetime.timedelta(seconds=settings.SPACE_RESERVATION_SECONDS)
+        return models.SpaceReservation.objects.create(
+            project=project, user=user, size=size, expire_datetime=expire_datetime
+        )
+
+
+class SpaceLimitExceeded(Exception):
+    """提交文件时，没有被预留覆盖的部分超出了项目空间上限。"""
+    pass
+
+
+def commit_space(project_id, user, size, limit, reservation_id=None):
+    """
+    文件写入后，将预留空间转为已使用空间。
+
+    没有预留、预留无效或预留小于实际大小时，超出预留的部分按 reserve_space 相同的方式
+    用带条件的 UPDATE 校验配额，不能绕过预留直接占用空间。需要在调用方的事务中调用，
+    抛出异常时连同文件记录一起回滚。
+
+    :param project_id: 项目ID。
+    :param user: 提交文件的用户，只能消耗自己的预留。
+    :param size: 实际写入的字节数。
+    :param limit: 项目空间上限（字节）。
+    :param reservation_id: 签发凭证时返回的预留ID。
+    :raises SpaceLimitExceeded: 超出预留的部分会使项目空间超过上限。
+    """
+    with transaction.atomic():
+        consumed = 0
+        if reservation_id:
+            reservation = models.SpaceReservation.objects.select_for_update().filter(
+                id=reservation_id, project_id=project_id, user=user
+            ).first()
+            if reservation:
+                consumed = min(reservation.size, size)
+                if consumed == reservation.size:
+                    reservation.delete()
+                else:
+                    models.SpaceReservation.objects.filter(id=reservation.id).update(size=F('size') - consumed)
+
+        queryset = models.Project.objects.filter(id=project_id)
+        extra = size - consumed
+        if extra:
+            queryset = queryset.filter(use_space__lte=Value(limit - extra) - (F('reserve_space') - consumed))
+        affected = queryset.update(
+            use_space=F('use_space') + size,
+            reserve_space=F('reserve_space') - consumed
+        )
+        if not affected:
+            raise SpaceLimitExceeded()
+
+
+def cancel_reservation(project_id, reservation_id):
+    """
+    操作失败时，立即释放尚未使用的空间预留，而不必等待其过期。
+
+    :param project_id: 项目ID。
+    :param reservation_id: 预留ID。
+    """
+    with transaction.atomic():
+        reservation = models.SpaceReservation.objects.select_for_update().filter(
+            id=reservation_id, project_id=project_id
+        ).first()
+        if not reservation:
+            return
+        reservation.delete()
+        models.Project.objects.filter(id=project_id).update(reserve_space=F('reserve_space') - reservation.size)
+
+
+def release_space(project_id, size):
+    """
+    删除文件后，原子地扣减项目已使用空间。
+
+    :param project_id: 项目ID。
+    :param size: 释放的字节数。
+    """
+    if size:
+        models.Project.objects.filter(id=project_id).update(use_space=F('use_space') - size)
+
+
+def release_expired_reservations(project_id=None):
+    """
+    回收已过期的空间预留。
+
+    :param project_id: 只回收指定项目的预留；为 None 时回收所有项目。
+    :return: 回收的预留记录数量。
+    """
+    queryset = models.SpaceReservation.objects.filter(expire_datetime__lte=datetime.datetime.now())
+    if project_id:
+        queryset = queryset.filter(project_id=project_id)
+
+    with transaction.atomic():
+        expired_list = list(queryset.select_for_update().values_list('id', 'project_id', 'size'))
+        if not expired_list:
+            return 0
+
+        project_size_dict = defaultdict(int)
+        for _, item_project_id, size in expired_list:
+            project_size_dict[item_project_id] += size
+
+        models.SpaceReservation.objects.filter(id__in=[item[0] for item in expired_list]).delete()
+        for item_project_id, size in project_size_dict.items():
+            models.Project.objects.filter(id=item_project_id).update(reserve_space=F('reserve_space') - size)
+
+    return len(expired_list)
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+from contextlib import aclosing
+
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+
+
+def _get_channel(project_id):
+    return f'project_events_{project_id}'
+
+
+class RedisBroker:
+    """
+    基于Redis发布/订阅的事件代理，多个进程、多台服务器之间共享事件。
+    发布使用 django_redis 的同步连接；订阅使用 redis.asyncio，每个进程共用一个异步连接池。
+    """
+    _client = None
+
+    @classmethod
+    def _get_async_client(cls):
+        if cls._client is None:
+            import redis.asyncio
+
+            options = settings.CACHES['default'].get('OPTIONS', {})
+            cls._client = redis.asyncio.from_url(
+                settings.CACHES['default']['LOCATION'], password=options.get('PASSWORD'), decode_responses=True
+            )
+        return cls._client
+
+    def publish(self, channel, message):
+        get_redis_connection().publish(channel, message)
+
+    async def subscribe(self, channel, timeout):
+        pubsub = self._get_async_client().pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            while True:
+                item = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+                yield item['data'] if item else None
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+
+class LocalBroker:
+    """
+    进程内的事件代理，只能在同一个进程中收发事件，用于测试和单进程调试。
+    发布可以在任意线程中调用，事件通过 call_soon_threadsafe 投递到订阅者所在的事件循环。
+    """
+    _subscribers = {}
+    _lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriber_list = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscriber_list:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def subscribe(self, channel, timeout):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+
+
+REALTIME_BROKERS = {
+    'redis': RedisBroker,
+    'local': LocalBroker,
+}
+
+
+def get_broker():
+    """ 根据 settings.REALTIME_BROKER 返回对应的事件代理实例。 """
+    return REALTIME_BROKERS[settings.REALTIME_BROKER]()
+
+
+def publish_issues_event(project_id, event_type, issues_ids, user, content=''):
+    """
+    向项目的事件频道推送问题变更。在事务中调用时，等事务提交后再推送；推送失败不影响发起变更的请求。
+
+    :param event_type: 'create' | 'change' | 'reply'
+    :param issues_ids: 发生变化的问题ID列表。
+    :param user: 操作者，前端据此忽略自己触发的事件。
+    :param content: 变更内容。
+    """
+    if not settings.REALTIME_ENABLED:
+        return
+    message = json.dumps({
+        'type': event_type,
+        'issues_ids': list(issues_ids),
+        'user_id': user.id,
+        'username': user.username,
+        'content': content,
+    })
+
+    def publish():
+        try:
+            get_broker().publish(_get_channel(project_id), message)
+        except Exception:
+            pass
+
+    transaction.on_commit(publish)
+
+
+async def iter_project_events(project_id):
+    """
+    订阅项目的事件频道，按 Server-Sent Events 格式逐条生成。
+    超过 REALTIME_HEARTBEAT_SECONDS 没有事件时发送一行注释作为心跳，让代理保持连接、并及时发现客户端断开。
+    """
+    yield 'retry: 3000\n\n'
+    subscription = get_broker().subscribe(_get_channel(project_id), settings.REALTIME_HEARTBEAT_SECONDS)
+    # 客户端断开时显式关闭订阅，释放Redis连接或本地队列
+    async with aclosing(subscription):
+        async for message in subscription:
+            if message is None:
+                yield ': ping\n\n'
+            else:
+                yield f'event: issues\ndata: {message}\n\n'
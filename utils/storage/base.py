@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, IO, Iterator, Optional
+
+
+class StorageFileNotFound(Exception):
+    """当存储中不存在指定文件（或无权访问）时引发的异常。"""
+    pass
+
+
+class BaseStorage:
+    """
+    对象存储后端的统一接口。
+
+    所有存储后端（腾讯云COS、本地磁盘、内存）都实现以下方法，业务代码只依赖这些方法，
+    通过 utils.storage.factory.get_storage 按 settings.STORAGE_BACKEND 获取具体实现。
+    """
+
+    def __init__(self, region: str = 'ap-chengdu'):
+        self.region = region
+
+    def create_bucket(self, bucket: str, acl: str = 'public-read'):
+        """创建一个新的存储桶。"""
+        raise NotImplementedError
+
+    def upload_file(self, bucket: str, file_object: IO, key: str) -> str:
+        """上传文件，返回文件的访问URL。"""
+        raise NotImplementedError
+
+    def delete_file(self, bucket: str, key: str):
+        """删除单个文件。"""
+        raise NotImplementedError
+
+    def delete_file_list(self, bucket: str, key_list: List[Dict[str, str]]):
+        """批量删除文件，key_list 格式如: [{'Key': 'file1.jpg'}, {'Key': 'file2.txt'}]。"""
+        raise NotImplementedError
+
+    def get_credential(self, bucket: str) -> Dict[str, Any]:
+        """生成用于前端直传的临时凭证。"""
+        raise NotImplementedError
+
+    def check_file(self, bucket: str, key: str) -> Dict[str, Any]:
+        """
+        获取文件元数据，至少包含 'ETag'（带双引号）和 'Content-Length'。
+        文件不存在时抛出 StorageFileNotFound。
+        """
+        raise NotImplementedError
+
+    def copy_file(self, bucket: str, source_key: str, key: str):
+        """在存储桶内复制文件，文件数据不经过应用服务器。"""
+        raise NotImplementedError
+
+    def list_files(self, bucket: str, prefix: str = '', page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        分页遍历存储桶中的文件，每次只在内存中保留一页。COS按key的字典序返回，其他后端不保证顺序。
+        每个元素包含 'Key'、'Size'（字节数）和 'LastModified'（UTC时间，未知时为None）。
+        """
+        raise NotImplementedError
+
+    def delete_bucket(self, bucket: str):
+        """清空并删除一个存储桶。"""
+        raise NotImplementedError
+
+    def get_url(self, bucket: str, key: str) -> str:
+        """返回文件的访问URL。"""
+        raise NotImplementedError
+
+    def open_file(self, bucket: str, key: str) -> IO:
+        """
+        以流的方式打开文件，返回支持 read() 和 close() 的文件对象。
+        文件不存在时抛出 StorageFileNotFound。
+        """
+        raise NotImplementedError
+
+    def get_upload_domain(self, host: str) -> Optional[str]:
+        """
+        前端 COS SDK 上传时使用的自定义域名，返回 None 表示使用COS默认域名。
+        :param host: 当前请求的主机名，例如 request.get_host()。
+        """
+        return None
+
+    def check_file_list(self, bucket: str, key_list: List[str], max_workers: int = 8) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        并发检查多个文件是否存在并获取其元数据。
+        使用有界线程池并发调用 check_file，N个文件只需约 N / max_workers 轮往返。
+        :param bucket: 存储桶名称。
+        :param key_list: 文件路径列表。
+        :param max_workers: 并发线程数上限。
+        :return: {key: 元数据字典}，文件不存在的key对应None。
+        """
+        def check(key):
+            try:
+                return self.check_file(bucket, key)
+            except StorageFileNotFound:
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(key_list, executor.map(check, key_list)))
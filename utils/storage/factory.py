@@ -0,0 +1,22 @@
+from django.conf import settings
+
+from utils.storage.local import LocalStorageManager
+from utils.storage.memory import MemoryStorageManager
+from utils.tencent.cos import CosManager
+
+STORAGE_BACKENDS = {
+    'cos': CosManager,
+    'local': LocalStorageManager,
+    'memory': MemoryStorageManager,
+}
+
+
+def get_storage(region: str = 'ap-chengdu'):
+    """
+    根据 settings.STORAGE_BACKEND 返回对应的存储后端实例。
+
+    使用示例:
+        storage_client = get_storage(region=project.region)
+        storage_client.delete_file(project.bucket, key)
+    """
+    return STORAGE_BACKENDS[settings.STORAGE_BACKEND](region=region)
@@ -0,0 +1,123 @@
+import datetime
+import hashlib
+import mmap
+import os
+import shutil
+import time
+from typing import List, Dict, Any, IO, Iterator, Optional
+
+from django.conf import settings
+from django.urls import reverse
+
+from utils.storage.base import BaseStorage, StorageFileNotFound
+
+
+class LocalStorageManager(BaseStorage):
+    """
+    本地磁盘存储后端，用于在没有网络的环境下压测和调试文件模块。
+
+    - 每个存储桶对应 settings.STORAGE_LOCAL_ROOT 下的一个目录。
+    - 计算ETag时通过 mmap 读取文件，避免把整个文件复制到Python内存中。
+    - open_file 返回真实的文件句柄，交给 FileResponse 后可由 wsgi.file_wrapper 使用 sendfile 发送。
+    """
+
+    def __init__(self, region: str = 'ap-chengdu'):
+        super().__init__(region=region)
+        self.root = str(settings.STORAGE_LOCAL_ROOT)
+
+    def _bucket_path(self, bucket: str) -> str:
+        return os.path.join(self.root, bucket)
+
+    def _file_path(self, bucket: str, key: str) -> str:
+        """将key转换为磁盘路径，并拒绝跳出存储桶目录的key。"""
+        bucket_path = os.path.abspath(self._bucket_path(bucket))
+        path = os.path.abspath(os.path.join(bucket_path, key))
+        if not path.startswith(bucket_path + os.sep):
+            raise StorageFileNotFound(f"非法的文件路径: {key}")
+        return path
+
+    def create_bucket(self, bucket: str, acl: str = 'public-read'):
+        os.makedirs(self._bucket_path(bucket), exist_ok=True)
+
+    def upload_file(self, bucket: str, file_object: IO, key: str) -> str:
+        path = self._file_path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(file_object, f)
+        return self.get_url(bucket, key)
+
+    def delete_file(self, bucket: str, key: str):
+        try:
+            os.remove(self._file_path(bucket, key))
+        except (FileNotFoundError, StorageFileNotFound):
+            pass
+
+    def delete_file_list(self, bucket: str, key_list: List[Dict[str, str]]):
+        for item in key_list:
+            self.delete_file(bucket, item['Key'])
+
+    def get_credential(self, bucket: str) -> Dict[str, Any]:
+        start_time = int(time.time())
+        return {
+            'credentials': {'tmpSecretId': 'local', 'tmpSecretKey': 'local', 'sessionToken': ''},
+            'startTime': start_time,
+            'expiredTime': start_time + 1800,
+        }
+
+    def check_file(self, bucket: str, key: str) -> Dict[str, Any]:
+        path = self._file_path(bucket, key)
+        try:
+            size = os.path.getsize(path)
+            hash_object = hashlib.md5()
+            if size:
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    hash_object.update(data)
+        except FileNotFoundError:
+            raise StorageFileNotFound(f"文件不存在: {key}")
+        return {'ETag': f'"{hash_object.hexdigest()}"', 'Content-Length': str(size)}
+
+    def copy_file(self, bucket: str, source_key: str, key: str):
+        path = self._file_path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            shutil.copyfile(self._file_path(bucket, source_key), path)
+        except FileNotFoundError:
+            raise StorageFileNotFound(f"文件不存在: {source_key}")
+
+    def list_files(self, bucket: str, prefix: str = '', page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        遍历目录的同时逐个返回文件，不先收集全部key，内存中只保留当前目录的文件名。
+        每个目录先返回其中的文件再进入子目录，因此结果不是严格的key字典序（例如 'b.txt' 排在 'a/c.txt' 之前）。
+        """
+        bucket_path = self._bucket_path(bucket)
+        for dir_path, dir_names, file_names in os.walk(bucket_path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                path = os.path.join(dir_path, file_name)
+                key = os.path.relpath(path, bucket_path).replace(os.sep, '/')
+                if not key.startswith(prefix):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield {
+                    'Key': key,
+                    'Size': stat.st_size,
+                    'LastModified': datetime.datetime.fromtimestamp(stat.st_mtime, datetime.timezone.utc),
+                }
+
+    def delete_bucket(self, bucket: str):
+        shutil.rmtree(self._bucket_path(bucket), ignore_errors=True)
+
+    def get_url(self, bucket: str, key: str) -> str:
+        return reverse('storage_object', kwargs={'bucket': bucket, 'key': key})
+
+    def open_file(self, bucket: str, key: str) -> IO:
+        try:
+            return open(self._file_path(bucket, key), 'rb')
+        except FileNotFoundError:
+            raise StorageFileNotFound(f"文件不存在: {key}")
+
+    def get_upload_domain(self, host: str) -> Optional[str]:
+        return f"{host}/storage/{{Bucket}}"
@@ -0,0 +1,80 @@
+import hashlib
+import io
+import threading
+import time
+from typing import List, Dict, Any, IO, Iterator, Optional
+
+from django.urls import reverse
+
+from utils.storage.base import BaseStorage, StorageFileNotFound
+
+
+class MemoryStorageManager(BaseStorage):
+    """
+    内存存储后端，所有数据保存在进程内的字典中，进程重启即丢失。
+    仅用于压测和调试，多个实例共享同一份数据。
+    """
+    _buckets: Dict[str, Dict[str, bytes]] = {}
+    _lock = threading.Lock()
+
+    def _get_bucket(self, bucket: str) -> Dict[str, bytes]:
+        with self._lock:
+            return self._buckets.setdefault(bucket, {})
+
+    def create_bucket(self, bucket: str, acl: str = 'public-read'):
+        self._get_bucket(bucket)
+
+    def upload_file(self, bucket: str, file_object: IO, key: str) -> str:
+        self._get_bucket(bucket)[key] = file_object.read()
+        return self.get_url(bucket, key)
+
+    def delete_file(self, bucket: str, key: str):
+        self._get_bucket(bucket).pop(key, None)
+
+    def delete_file_list(self, bucket: str, key_list: List[Dict[str, str]]):
+        bucket_dict = self._get_bucket(bucket)
+        for item in key_list:
+            bucket_dict.pop(item['Key'], None)
+
+    def get_credential(self, bucket: str) -> Dict[str, Any]:
+        start_time = int(time.time())
+        return {
+            'credentials': {'tmpSecretId': 'memory', 'tmpSecretKey': 'memory', 'sessionToken': ''},
+            'startTime': start_time,
+            'expiredTime': start_time + 1800,
+        }
+
+    def check_file(self, bucket: str, key: str) -> Dict[str, Any]:
+        data = self._get_bucket(bucket).get(key)
+        if data is None:
+            raise StorageFileNotFound(f"文件不存在: {key}")
+        return {'ETag': f'"{hashlib.md5(data).hexdigest()}"', 'Content-Length': str(len(data))}
+
+    def copy_file(self, bucket: str, source_key: str, key: str):
+        bucket_dict = self._get_bucket(bucket)
+        if source_key not in bucket_dict:
+            raise StorageFileNotFound(f"文件不存在: {source_key}")
+        bucket_dict[key] = bucket_dict[source_key]
+
+    def list_files(self, bucket: str, prefix: str = '', page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        bucket_dict = self._get_bucket(bucket)
+        for key in sorted(key for key in list(bucket_dict) if key.startswith(prefix)):
+            data = bucket_dict.get(key)
+            if data is not None:
+                yield {'Key': key, 'Size': len(data), 'LastModified': None}
+
+    def delete_bucket(self, bucket: str):
+        with self._lock:
+            self._buckets.pop(bucket, None)
+
+    def get_url(self, bucket: str, key: str) -> str:
+        return reverse('storage_object', kwargs={'bucket': bucket, 'key': key})
+
+    def open_file(self, bucket: str, key: str) -> IO:
+        data = self._get_bucket(bucket).get(key)
+        if data is None:
+            raise StorageFileNotFound(f"文件不存在: {key}")
+        return io.BytesIO(data)
+
+    def get_upload_domain(self, host: str) -> Optional[str]:
+        return f"{host}/storage/{{Bucket}}"
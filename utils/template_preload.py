@@ -0,0 +1,33 @@
+import os
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+
+
+def get_template_names(app_label='app'):
+    """ 返回应用 templates 目录下所有 .html 模板的名称，例如 'app/issues.html'。 """
+    template_dir = os.path.join(apps.get_app_config(app_label).path, 'templates')
+    name_list = []
+    for dir_path, _, file_names in os.walk(template_dir):
+        for file_name in file_names:
+            if file_name.endswith('.html'):
+                name_list.append(os.path.relpath(os.path.join(dir_path, file_name), template_dir).replace(os.sep, '/'))
+    return sorted(name_list)
+
+
+def preload_templates(app_label='app'):
+    """
+    预编译应用中的所有模板，编译结果保存在 cached.Loader 中，首个请求不再需要读取和解析模板。
+    同时起到校验作用：任何模板有语法错误或引用了不存在的标签库时，直接抛出异常使进程启动失败。
+
+    :return: 预编译的模板数量。
+    """
+    engine = engines['django']
+    name_list = get_template_names(app_label)
+    for name in name_list:
+        try:
+            engine.get_template(name)
+        except Exception as e:
+            raise ImproperlyConfigured(f"模板 {name} 预编译失败: {e}") from e
+    return len(name_list)
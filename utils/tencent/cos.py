@@ -1,9 +1,12 @@
-from typing import List, Dict, Any, IO
+import datetime
+from typing import List, Dict, Any, IO, Iterator
 from django.conf import settings
 from qcloud_cos import CosConfig, CosS3Client, CosServiceError
 from sts.sts import Sts
 
-class CosManager:
+from utils.storage.base import BaseStorage, StorageFileNotFound
+
+class CosManager(BaseStorage):
     """
     腾讯云对象存储COS操作的管理器。
 
@@ -35,7 +38,7 @@ class CosManager:
         # 创建CosConfig和CosS3Client，后续所有方法共享此客户端
         config = CosConfig(Region=region, SecretId=secret_id, SecretKey=secret_key)
         self.client = CosS3Client(config)
-        self.region = region
+        super().__init__(region=region)
 
     def create_bucket(self, bucket: str, acl: str = 'public-read'):
         """
@@ -68,7 +71,7 @@ class CosManager:
             Body=file_object,
             Key=key
         )
-        return f"https://{bucket}.cos.{self.region}.myqcloud.com/{key}"
+        return self.get_url(bucket, key)
 
     def delete_file(self, bucket: str, key: str):
         """
@@ -118,9 +121,65 @@ class CosManager:
         使用HEAD请求，比GET请求更高效，因为它只获取头部信息而不传输文件内容。
         :param bucket: 存储桶名称。
         :param key: 文件的路径。
-        :return: 文件的元数据字典。如果文件不存在，会抛出CosServiceError异常。
+        :return: 文件的元数据字典。如果文件不存在，会抛出StorageFileNotFound异常。
+        """
+        try:
+            return self.client.head_object(Bucket=bucket, Key=key)
+        except CosServiceError as e:
+            raise StorageFileNotFound(str(e)) from e
+
+    def get_url(self, bucket: str, key: str) -> str:
+        """
+        返回文件的公网访问URL（存储桶为公共读）。
+        :param bucket: 存储桶名称。
+        :param key: 文件的路径。
+        """
+        return f"https://{bucket}.cos.{self.region}.myqcloud.com/{key}"
+
+    def open_file(self, bucket: str, key: str) -> IO:
+        """
+        以流的方式下载文件，返回底层的HTTP响应流，读取时才真正传输数据。
+        :param bucket: 存储桶名称。
+        :param key: 文件的路径。
+        :return: 支持 read() 和 close() 的文件对象。如果文件不存在，会抛出StorageFileNotFound异常。
+        """
+        try:
+            response = self.client.get_object(Bucket=bucket, Key=key)
+        except CosServiceError as e:
+            raise StorageFileNotFound(str(e)) from e
+        return response['Body'].get_raw_stream()
+
+    def copy_file(self, bucket: str, source_key: str, key: str):
+        """
+        在存储桶内复制文件（服务端复制），文件数据不经过应用服务器。
+        :param bucket: 存储桶名称。
+        :param source_key: 源文件的路径。
+        :param key: 目标文件的路径。
         """
-        return self.client.head_object(Bucket=bucket, Key=key)
+        copy_source = {'Bucket': bucket, 'Key': source_key, 'Region': self.region}
+        self.client.copy_object(Bucket=bucket, Key=key, CopySource=copy_source)
+
+    def list_files(self, bucket: str, prefix: str = '', page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        分页列出存储桶中的文件，COS按key的字典序返回，每页最多1000个。
+        :param bucket: 存储桶名称。
+        :param prefix: 只列出以此为前缀的文件。
+        :param page_size: 每页的文件数量。
+        """
+        marker = ''
+        while True:
+            response = self.client.list_objects(Bucket=bucket, Prefix=prefix, Marker=marker, MaxKeys=page_size)
+            contents = response.get('Contents') or []
+            for item in contents:
+                last_modified = datetime.datetime.strptime(item['LastModified'], '%Y-%m-%dT%H:%M:%S.%fZ')
+                yield {
+                    'Key': item['Key'],
+                    'Size': int(item['Size']),
+                    'LastModified': last_modified.replace(tzinfo=datetime.timezone.utc),
+                }
+            if response.get('IsTruncated') != 'true' or not contents:
+                break
+            marker = response.get('NextMarker') or contents[-1]['Key']
 
     def delete_bucket(self, bucket: str):
         """
@@ -0,0 +1,116 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from PIL import Image
+
+from app import models
+from utils.storage.factory import get_storage
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp'}
+
+# 后台生成缩略图的线程池，避免图片解码和缩放占用请求线程
+_executor = ThreadPoolExecutor(max_workers=settings.THUMBNAIL_MAX_WORKERS, thread_name_prefix='thumbnail')
+
+
+def is_image(name):
+    """根据文件扩展名判断是否需要生成缩略图。"""
+    return name.rsplit('.', 1)[-1].lower() in THUMBNAIL_EXTENSIONS
+
+
+def get_thumbnail_key(key):
+    """缩略图与原图存放在同一个存储桶中，key 由原图 key 推导得到。"""
+    return f"thumbnail/{key}.jpg"
+
+
+def make_thumbnail(file_object):
+    """
+    将图片缩放为不超过 THUMBNAIL_SIZE 的 JPEG 缩略图。
+
+    :param file_object: 图片文件对象（需要支持 seek）。
+    :return: 包含缩略图数据的 BytesIO 对象。
+    :raises ValueError: 解码尺寸超过 THUMBNAIL_MAX_PIXELS。
+    """
+    image = Image.open(file_object)
+    # 对JPEG直接以缩小的尺寸解码，大图可以少解码大部分像素
+    image.draft('RGB', settings.THUMBNAIL_SIZE)
+    # open() 和 draft() 只读取文件头，此时的尺寸就是实际要解码的尺寸
+    width, height = image.size
+    if width * height > settings.THUMBNAIL_MAX_PIXELS:
+        raise ValueError(f"图片尺寸过大: {width}x{height}")
+    image.thumbnail(settings.THUMBNAIL_SIZE)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=85, optimize=True)
+    buffer.seek(0)
+    return buffer
+
+
+def generate_thumbnail(region, bucket, key, data=None):
+    """
+    生成并上传缩略图。
+
+    :param region: 存储桶所在地域。
+    :param bucket: 存储桶名称。
+    :param key: 原图的 key。
+    :param data: 原图的字节数据；为 None 时从存储中读取原图。
+    :return: 缩略图的访问URL。
+    """
+    storage_client = get_storage(region=region)
+    if data is None:
+        stream = storage_client.open_file(bucket, key)
+        try:
+            data = stream.read()
+        finally:
+            stream.close()
+
+    thumbnail = make_thumbnail(io.BytesIO(data))
+    return storage_client.upload_file(bucket, thumbnail, get_thumbnail_key(key))
+
+
+def submit_file_thumbnails(project, file_list):
+    """
+    将文件库中的图片提交到后台线程池生成缩略图，生成后写入 FileRepository.thumbnail_path。
+
+    :param project: 项目对象。
+    :param file_list: FileRepository 对象列表，非图片文件和超过 THUMBNAIL_MAX_FILE_SIZE 的文件会被跳过。
+    """
+    for file_object in file_list:
+        if is_image(file_object.name) and (file_object.file_size or 0) <= settings.THUMBNAIL_MAX_FILE_SIZE:
+            _executor.submit(_generate_file_thumbnail, project.region, project.bucket, file_object.id, file_object.key)
+
+
+def submit_wiki_thumbnail(project, key, data):
+    """
+    将wiki图片提交到后台线程池生成缩略图。
+
+    :param project: 项目对象。
+    :param key: 原图的 key。
+    :param data: 原图的字节数据，上传请求结束后临时文件会被清理，因此需要提前读出。
+    :return: 缩略图的访问URL（后台生成完成前访问会返回404）。
+    """
+    _executor.submit(_generate_wiki_thumbnail, project.region, project.bucket, key, data)
+    return get_storage(region=project.region).get_url(project.bucket, get_thumbnail_key(key))
+
+
+def _generate_file_thumbnail(region, bucket, file_id, key):
+    try:
+        thumbnail_path = generate_thumbnail(region, bucket, key)
+        models.FileRepository.objects.filter(id=file_id).update(thumbnail_path=thumbnail_path)
+    except Exception:
+        logger.exception("生成缩略图失败: %s", key)
+    finally:
+        close_old_connections()
+
+
+def _generate_wiki_thumbnail(region, bucket, key, data):
+    try:
+        generate_thumbnail(region, bucket, key, data=data)
+    except Exception:
+        logger.exception("生成缩略图失败: %s", key)
@@ -0,0 +1,127 @@
+import io
+import posixpath
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """
+    zipfile 的写入目标：只追加、不可 seek。
+
+    zipfile 检测到目标不可 seek 时，会改用数据描述符（data descriptor）记录大小和CRC，
+    因此可以边压缩边把已经写出的字节交给HTTP响应，无需把整个压缩包暂存在内存或磁盘中。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def pop(self):
+        """取出目前为止写入的所有字节。"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _unique_arcname(arcname, used_names):
+    """ 同一目录下有同名文件时，在扩展名前加序号: a.txt -> a (1).txt。 """
+    if arcname not in used_names:
+        return arcname
+    root, ext = posixpath.splitext(arcname)
+    index = 1
+    while f"{root} ({index}){ext}" in used_names:
+        index += 1
+    return f"{root} ({index}){ext}"
+
+
+def iter_zip_stream(entries, prefetch=4, chunk_size=64 * 1024):
+    """
+    将一组文件流式打包为 ZIP64 压缩包。
+
+    后台线程池按顺序提前打开后续的文件（建立连接、等待首字节），当前文件读完时下一个文件通常已经就绪；
+    正在写入的文件和预取的文件合计，同一时刻最多有 prefetch 个文件处于打开状态。
+    压缩包内路径重复的文件（同一目录下的同名文件）自动加序号，重复的目录只写入一次。
+
+    :param entries: 可迭代对象，每一项为 (压缩包内路径, 修改时间, opener)；
+                    opener 为 None 表示目录，否则调用后返回支持 read()/close() 的文件对象，返回 None 表示跳过该文件。
+    :param prefetch: 同时打开的文件数上限（至少为1）。
+    :param chunk_size: 每次从文件中读取的字节数。
+    :return: 生成器，逐块返回压缩包的字节数据，可直接交给 StreamingHttpResponse。
+    """
+    prefetch = max(prefetch, 1)
+    buffer = _ZipStreamBuffer()
+    entries = iter(entries)
+    window = deque()
+    used_names = set()
+
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        def fill_window():
+            while len(window) < prefetch:
+                entry = next(entries, None)
+                if entry is None:
+                    return
+                arcname, date_time, opener = entry
+                window.append((arcname, date_time, executor.submit(opener) if opener else None))
+
+        try:
+            with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
+                while True:
+                    # 上一个文件已经关闭，此时补满窗口；取出一个之后，正在写入的文件和窗口中的文件合计不超过 prefetch
+                    fill_window()
+                    if not window:
+                        break
+                    arcname, date_time, future = window.popleft()
+
+                    if future is None:
+                        if arcname not in used_names:
+                            used_names.add(arcname)
+                            zip_file.writestr(zipfile.ZipInfo(f"{arcname}/", date_time=date_time.timetuple()[:6]), b'')
+                        continue
+
+                    stream = future.result()
+                    if stream is None:
+                        continue
+
+                    arcname = _unique_arcname(arcname, used_names)
+                    used_names.add(arcname)
+                    zip_info = zipfile.ZipInfo(arcname, date_time=date_time.timetuple()[:6])
+                    zip_info.compress_type = zipfile.ZIP_DEFLATED
+                    try:
+                        with zip_file.open(zip_info, 'w', force_zip64=True) as f:
+                            while True:
+                                chunk = stream.read(chunk_size)
+                                if not chunk:
+                                    break
+                                f.write(chunk)
+                                data = buffer.pop()
+                                if data:
+                                    yield data
+                    finally:
+                        stream.close()
+                    yield buffer.pop()
+            yield buffer.pop()
+        finally:
+            # 客户端中途断开或打包出错时，取消尚未开始的预取，关闭已经打开但尚未读取的文件；
+            # 预取本身的异常在这里忽略，不掩盖原来的异常
+            for _, _, future in window:
+                if future is None or future.cancel():
+                    continue
+                try:
+                    stream = future.result()
+                except Exception:
+                    continue
+                if stream is not None:
+                    stream.close()